@@ -0,0 +1,8 @@
+-- Stored generated latitude/longitude columns on vehicles.
+-- The coordinates are computed once on write and returned by plain
+-- SELECTs, so reads no longer invoke ST_Y/ST_X per request.
+ALTER TABLE vehicles
+    ADD COLUMN IF NOT EXISTS latitude DOUBLE PRECISION
+        GENERATED ALWAYS AS (ST_Y(location::geometry)) STORED,
+    ADD COLUMN IF NOT EXISTS longitude DOUBLE PRECISION
+        GENERATED ALWAYS AS (ST_X(location::geometry)) STORED;
@@ -0,0 +1,7 @@
+-- Partial GiST index for the nearby/search hot path.
+-- Only live, bookable vehicles are indexed, so soft-deleted and
+-- unavailable rows never inflate the index or the scan.
+-- CONCURRENTLY avoids locking the table; run outside a transaction.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS vehicles_live_geog_gix
+ON vehicles USING gist ((location::geography))
+WHERE deleted_at IS NULL AND available = true;
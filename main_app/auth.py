@@ -21,10 +21,6 @@ def generate_otp() -> str:
     """Generate 6-digit OTP"""
     return str(random.randint(100000, 999999))
 
-def is_otp_valid(otp_expires_at: datetime) -> bool:
-    """Check if OTP is still valid"""
-    return datetime.now(timezone.utc) < otp_expires_at
-
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create long-lived JWT access token"""
     to_encode = data.copy()
@@ -1,9 +1,12 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from .routers import users, vehicles, bookings, owner
 from .routers import owner_additional, messaging, websocket, error_audit
 from .payment import router as payment_router
-from .logging_config import setup_logging
+from .db import engine
+from .logging_config import setup_logging, get_logger, log_error
 from .middleware import LoggingMiddleware
 from .error_middleware import ErrorAuditMiddleware
 
@@ -13,7 +16,8 @@ setup_logging()
 app = FastAPI(
     title="Redi Rental API",
     description="Vehicle rental platform API",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 app.add_middleware(
@@ -29,6 +33,27 @@ app.add_middleware(LoggingMiddleware)
 # Add error audit middleware
 app.add_middleware(ErrorAuditMiddleware)
 
+logger = get_logger("app")
+
+# Database failures are handled once here so endpoints stay exception-free
+# on the hot path instead of each wrapping its body in try/except walls.
+# The session dependencies already roll back before re-raising.
+@app.exception_handler(IntegrityError)
+async def integrity_error_handler(request: Request, exc: IntegrityError):
+    log_error(logger, exc, {"path": request.url.path}, "integrity_error")
+    return ORJSONResponse(
+        status_code=409,
+        content={"detail": "Request conflicts with existing data. Please check your details."}
+    )
+
+@app.exception_handler(SQLAlchemyError)
+async def sqlalchemy_error_handler(request: Request, exc: SQLAlchemyError):
+    log_error(logger, exc, {"path": request.url.path}, "database_error")
+    return ORJSONResponse(
+        status_code=500,
+        content={"detail": "Database error occurred. Please try again."}
+    )
+
 # Include routers
 app.include_router(users.router)
 app.include_router(vehicles.router)
@@ -46,5 +71,5 @@ def root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
+    return {"status": "healthy", "db_pool": engine.pool.status()}
 
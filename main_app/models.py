@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Text, ForeignKey, Integer, text, Enum, Numeric, Time, Date, JSON, Index
+from sqlalchemy import Column, String, Boolean, DateTime, Text, ForeignKey, Integer, text, Enum, Numeric, Time, Date, JSON, Index, Computed, Float
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from geoalchemy2 import Geography
@@ -31,6 +31,10 @@ class VehicleModel(Base):
     brand = Column(Text, nullable=False)
     model = Column(Text, nullable=False)
     location = Column(Geography(geometry_type='POINT', srid=4326), nullable=False)
+    # Stored generated columns (see add_vehicle_latlng_columns.sql) so reads
+    # get the coordinates from the heap tuple without ST_X/ST_Y per request
+    latitude = Column(Float, Computed("ST_Y(location::geometry)", persisted=True))
+    longitude = Column(Float, Computed("ST_X(location::geometry)", persisted=True))
     available = Column(Boolean, server_default=text('true'))
     vehicle_type = Column(Text, nullable=False)
     color = Column(Text, nullable=False)
@@ -0,0 +1,11 @@
+import os
+import redis.asyncio as redis
+from dotenv import load_dotenv
+from .logging_config import get_logger
+
+load_dotenv()
+logger = get_logger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+redis_client = redis.Redis.from_url(REDIS_URL, decode_responses=True)
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import text, and_, or_
+from sqlalchemy import text, and_, or_, insert
 from uuid import UUID
 from datetime import datetime, timezone
 from typing import List
@@ -9,12 +10,89 @@ from ..db import get_db
 from ..models import Conversation, Message, Booking, VehicleModel, User
 from ..schemas import SendMessageRequest, MessageResponse, ConversationSummary
 from ..auth import get_current_user
+from ..redis_client import redis_client
 from .websocket import notify_new_message, notify_message_read
 from ..logging_config import get_logger, log_error
 
 logger = get_logger(__name__)
 
-router = APIRouter(prefix="/messages", tags=["messaging"])
+router = APIRouter(prefix="/messages", tags=["messaging"], default_response_class=ORJSONResponse)
+
+# Hot-path statements are constructed once at import so SQLAlchemy's
+# compiled-statement cache keys on the same object for every request
+_CONVERSATIONS_SQL = text("""
+    SELECT
+        c.id, c.booking_id, c.last_message_at,
+        CASE
+            WHEN c.owner_id = :user_id THEN c.owner_unread_count
+            ELSE c.renter_unread_count
+        END as unread_count,
+        CASE
+            WHEN c.owner_id = :user_id THEN u_renter.full_name
+            ELSE u_owner.full_name
+        END as other_user_name,
+        CONCAT(v.brand, ' ', v.model, ' (', v.license_plate, ')') as vehicle_info,
+        COALESCE(m.message_text, 'No messages yet') as last_message,
+        CASE WHEN c.owner_id = :user_id THEN true ELSE false END as is_owner
+    FROM conversations c
+    JOIN bookings b ON c.booking_id = b.id
+    JOIN vehicles v ON b.vehicle_id = v.id
+    JOIN users u_owner ON c.owner_id = u_owner.id
+    JOIN users u_renter ON c.renter_id = u_renter.id
+    LEFT JOIN messages m ON m.id = (
+        SELECT id FROM messages
+        WHERE conversation_id = c.id
+        ORDER BY created_at DESC
+        LIMIT 1
+    )
+    WHERE c.owner_id = :user_id OR c.renter_id = :user_id
+    ORDER BY c.last_message_at DESC
+""")
+
+# Newest page selected in the subquery, re-sorted ascending so rows
+# arrive oldest-first and need no reversal in Python. Sender names
+# come from the Redis-cached participant map instead of a users join.
+_MESSAGE_PAGE_SQL = text("""
+    SELECT * FROM (
+        SELECT
+            m.id, m.sender_id, m.message_text, m.message_type,
+            m.attachment_url, m.is_read, m.created_at
+        FROM messages m
+        WHERE m.conversation_id = :conversation_id
+        ORDER BY m.created_at DESC
+        LIMIT :limit OFFSET :offset
+    ) t
+    ORDER BY t.created_at ASC
+""")
+
+_UNREAD_COUNT_SQL = text("""
+    SELECT SUM(
+        CASE
+            WHEN owner_id = :user_id THEN owner_unread_count
+            ELSE renter_unread_count
+        END
+    ) as total_unread
+    FROM conversations
+    WHERE owner_id = :user_id OR renter_id = :user_id
+""")
+
+async def get_conversation_names(db: Session, conversation: Conversation) -> dict:
+    """Participant id -> full_name map for a conversation, cached in Redis.
+
+    Only two names ever appear in a conversation, so caching them removes
+    the users join from every message page read. Cache-aside: filled on
+    first read, shared by all subsequent pages.
+    """
+    key = f"conv:{conversation.id}:names"
+    names = await redis_client.hgetall(key)
+    if not names:
+        rows = db.query(User.id, User.full_name).filter(
+            User.id.in_([conversation.owner_id, conversation.renter_id])
+        ).all()
+        names = {str(user_id): full_name for user_id, full_name in rows}
+        if names:
+            await redis_client.hset(key, mapping=names)
+    return names
 
 @router.post("/send")
 async def send_message(
@@ -26,27 +104,26 @@ async def send_message(
     try:
         user_id = UUID(current_user["user_id"])
         booking_id = message_data.booking_id
-        
-        # Verify booking exists and user is part of it
-        booking = db.query(Booking).join(VehicleModel).filter(
+
+        # Verify booking access and fetch the conversation in one round trip
+        row = db.query(Booking, Conversation).join(VehicleModel).outerjoin(
+            Conversation, Conversation.booking_id == Booking.id
+        ).filter(
             Booking.id == booking_id,
             or_(
                 Booking.renter_id == user_id,
                 VehicleModel.owner_id == user_id
             )
         ).first()
-        
-        if not booking:
+
+        if not row:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Booking not found or access denied"
             )
-        
-        # Get or create conversation
-        conversation = db.query(Conversation).filter(
-            Conversation.booking_id == booking_id
-        ).first()
-        
+
+        booking, conversation = row
+
         if not conversation:
             # Create new conversation
             conversation = Conversation(
@@ -57,15 +134,17 @@ async def send_message(
             db.add(conversation)
             db.flush()
         
-        # Create message
-        message = Message(
-            conversation_id=conversation.id,
-            sender_id=user_id,
-            message_text=message_data.message_text,
-            message_type=message_data.message_type,
-            attachment_url=message_data.attachment_url
-        )
-        db.add(message)
+        # Create message; RETURNING hands back the server-assigned id and
+        # timestamp on the INSERT itself, so no refresh round trip is needed
+        message_id, message_created_at = db.execute(
+            insert(Message).values(
+                conversation_id=conversation.id,
+                sender_id=user_id,
+                message_text=message_data.message_text,
+                message_type=message_data.message_type,
+                attachment_url=message_data.attachment_url
+            ).returning(Message.id, Message.created_at)
+        ).one()
         
         # Update conversation
         conversation.last_message_at = datetime.now(timezone.utc)
@@ -77,34 +156,33 @@ async def send_message(
             conversation.owner_unread_count += 1
         
         db.commit()
-        db.refresh(message)
         
         # Send real-time notification
         recipient_id = conversation.renter_id if user_id == conversation.owner_id else conversation.owner_id
         sender = db.query(User).filter(User.id == user_id).first()
         
         await notify_new_message(str(recipient_id), sender.full_name, {
-            "id": str(message.id),
+            "id": str(message_id),
             "booking_id": str(booking_id),
             "sender_id": str(user_id),
             "sender_name": sender.full_name,
-            "message_text": message.message_text,
-            "message_type": message.message_type,
-            "created_at": message.created_at.isoformat()
+            "message_text": message_data.message_text,
+            "message_type": message_data.message_type,
+            "created_at": message_created_at.isoformat()
         })
         
         logger.info(f"Message sent successfully", extra={
-            "message_id": str(message.id),
+            "message_id": str(message_id),
             "sender_id": str(user_id),
             "recipient_id": str(recipient_id),
             "booking_id": str(booking_id),
-            "message_type": message.message_type,
-            "message_length": len(message.message_text)
+            "message_type": message_data.message_type,
+            "message_length": len(message_data.message_text)
         })
         
         return {
             "success": True,
-            "message_id": str(message.id),
+            "message_id": message_id,
             "message": "Message sent successfully"
         }
     
@@ -130,46 +208,17 @@ def get_conversations(
     """Get all conversations for current user"""
     try:
         user_id = UUID(current_user["user_id"])
-        
-        sql = """
-            SELECT 
-                c.id, c.booking_id, c.last_message_at,
-                CASE 
-                    WHEN c.owner_id = :user_id THEN c.owner_unread_count
-                    ELSE c.renter_unread_count
-                END as unread_count,
-                CASE 
-                    WHEN c.owner_id = :user_id THEN u_renter.full_name
-                    ELSE u_owner.full_name
-                END as other_user_name,
-                CONCAT(v.brand, ' ', v.model, ' (', v.license_plate, ')') as vehicle_info,
-                COALESCE(m.message_text, 'No messages yet') as last_message,
-                CASE WHEN c.owner_id = :user_id THEN true ELSE false END as is_owner
-            FROM conversations c
-            JOIN bookings b ON c.booking_id = b.id
-            JOIN vehicles v ON b.vehicle_id = v.id
-            JOIN users u_owner ON c.owner_id = u_owner.id
-            JOIN users u_renter ON c.renter_id = u_renter.id
-            LEFT JOIN messages m ON m.id = (
-                SELECT id FROM messages 
-                WHERE conversation_id = c.id 
-                ORDER BY created_at DESC 
-                LIMIT 1
-            )
-            WHERE c.owner_id = :user_id OR c.renter_id = :user_id
-            ORDER BY c.last_message_at DESC
-        """
-        
-        result = db.execute(text(sql), {"user_id": str(user_id)}).fetchall()
+
+        result = db.execute(_CONVERSATIONS_SQL, {"user_id": str(user_id)}).fetchall()
         
         conversations = [
             {
-                "id": str(row.id),
-                "booking_id": str(row.booking_id),
+                "id": row.id,
+                "booking_id": row.booking_id,
                 "other_user_name": row.other_user_name,
                 "vehicle_info": row.vehicle_info,
                 "last_message": row.last_message,
-                "last_message_at": row.last_message_at.isoformat(),
+                "last_message_at": row.last_message_at,
                 "unread_count": row.unread_count,
                 "is_owner": row.is_owner
             }
@@ -191,7 +240,7 @@ def get_conversations(
 
 @router.get("/conversations/{booking_id}/messages")
 async def get_messages(
-    booking_id: str,
+    booking_id: UUID,
     current_user: dict = Depends(get_current_user),
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100),
@@ -200,32 +249,30 @@ async def get_messages(
     """Get messages for a specific booking conversation"""
     try:
         user_id = UUID(current_user["user_id"])
-        booking_uuid = UUID(booking_id)
-        
-        # Verify booking exists and user has access
-        booking = db.query(Booking).join(VehicleModel).filter(
-            Booking.id == booking_uuid,
+
+        # Verify booking access and fetch the conversation in one round trip
+        row = db.query(Booking, Conversation).join(VehicleModel).outerjoin(
+            Conversation, Conversation.booking_id == Booking.id
+        ).filter(
+            Booking.id == booking_id,
             or_(
                 Booking.renter_id == user_id,
                 VehicleModel.owner_id == user_id
             )
         ).first()
-        
-        if not booking:
+
+        if not row:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Booking not found or access denied"
             )
-        
-        # Get or create conversation
-        conversation = db.query(Conversation).filter(
-            Conversation.booking_id == booking_uuid
-        ).first()
-        
+
+        booking, conversation = row
+
         if not conversation:
             # Create new conversation
             conversation = Conversation(
-                booking_id=booking_uuid,
+                booking_id=booking_id,
                 owner_id=booking.vehicle.owner_id,
                 renter_id=booking.renter_id
             )
@@ -233,38 +280,28 @@ async def get_messages(
             db.flush()
         
         offset = (page - 1) * limit
-        
-        sql = """
-            SELECT 
-                m.id, m.sender_id, m.message_text, m.message_type,
-                m.attachment_url, m.is_read, m.created_at,
-                u.full_name as sender_name
-            FROM messages m
-            JOIN users u ON m.sender_id = u.id
-            WHERE m.conversation_id = :conversation_id
-            ORDER BY m.created_at DESC
-            LIMIT :limit OFFSET :offset
-        """
-        
-        result = db.execute(text(sql), {
+
+        result = db.execute(_MESSAGE_PAGE_SQL, {
             "conversation_id": str(conversation.id),
             "limit": limit,
             "offset": offset
         }).fetchall()
-        
+
+        sender_names = await get_conversation_names(db, conversation)
+
         messages = [
             {
-                "id": str(row.id),
-                "sender_id": str(row.sender_id),
-                "sender_name": row.sender_name,
+                "id": row.id,
+                "sender_id": row.sender_id,
+                "sender_name": sender_names.get(str(row.sender_id)),
                 "message_text": row.message_text,
                 "message_type": row.message_type,
                 "attachment_url": row.attachment_url,
                 "is_read": row.is_read,
-                "created_at": row.created_at.isoformat(),
-                "is_own_message": str(row.sender_id) == str(user_id)
+                "created_at": row.created_at,
+                "is_own_message": row.sender_id == user_id
             }
-            for row in reversed(result)  # Reverse to show oldest first
+            for row in result
         ]
         
         # Mark messages as read and get message IDs
@@ -320,19 +357,8 @@ def get_unread_count(
     """Get total unread message count for user"""
     try:
         user_id = UUID(current_user["user_id"])
-        
-        sql = """
-            SELECT SUM(
-                CASE 
-                    WHEN owner_id = :user_id THEN owner_unread_count
-                    ELSE renter_unread_count
-                END
-            ) as total_unread
-            FROM conversations
-            WHERE owner_id = :user_id OR renter_id = :user_id
-        """
-        
-        result = db.execute(text(sql), {"user_id": str(user_id)}).scalar()
+
+        result = db.execute(_UNREAD_COUNT_SQL, {"user_id": str(user_id)}).scalar()
         
         return {"unread_count": result or 0}
     
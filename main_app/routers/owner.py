@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import text, func
+from sqlalchemy import text, func, update
 from uuid import UUID
 from datetime import datetime, timezone, timedelta
 from typing import List, Optional
@@ -12,26 +13,75 @@ from ..logging_config import get_logger, log_error
 
 logger = get_logger(__name__)
 
-router = APIRouter(prefix="/owner", tags=["owner"])
+router = APIRouter(prefix="/owner", tags=["owner"], default_response_class=ORJSONResponse)
+
+# Hot-path statements are constructed once at import so SQLAlchemy's
+# compiled-statement cache keys on the same object for every request
+_PENDING_BOOKINGS_SQL = text("""
+    SELECT 
+        b.id, b.start_time, b.end_time, b.total_amount, b.created_at,
+        b.pickup_address, b.special_instructions,
+        v.vehicle_type, v.brand, v.model, v.license_plate,
+        u.full_name as renter_name, u.phone_number as renter_phone
+    FROM bookings b
+    JOIN vehicles v ON b.vehicle_id = v.id
+    JOIN users u ON b.renter_id = u.id
+    WHERE v.owner_id = :owner_id AND b.status = 'pending'
+    ORDER BY b.created_at ASC
+""")
+
+_ACTIVE_BOOKINGS_SQL = text("""
+    SELECT 
+        b.id, b.start_time, b.end_time, b.status, b.total_amount, b.created_at,
+        b.pickup_address, b.dropoff_address,
+        v.vehicle_type, v.brand, v.model, v.license_plate,
+        u.full_name as renter_name, u.phone_number as renter_phone
+    FROM bookings b
+    JOIN vehicles v ON b.vehicle_id = v.id
+    JOIN users u ON b.renter_id = u.id
+    WHERE v.owner_id = :owner_id AND b.status IN ('confirmed', 'active')
+    ORDER BY b.start_time ASC
+""")
+
+_OWNER_VEHICLES_SQL = text("""
+    SELECT 
+        v.id, v.brand, v.model, v.vehicle_type, v.color, v.year, 
+        v.license_plate, v.available, v.created_at,
+        COUNT(b.id) as total_bookings,
+        COUNT(CASE WHEN b.status = 'pending' THEN 1 END) as pending_bookings,
+        COUNT(CASE WHEN b.status IN ('confirmed', 'active') THEN 1 END) as active_bookings,
+        COALESCE(SUM(CASE WHEN b.status IN ('confirmed', 'completed') THEN b.total_amount END), 0) as total_earnings
+    FROM vehicles v
+    LEFT JOIN bookings b ON v.id = b.vehicle_id
+    WHERE v.owner_id = :owner_id AND v.deleted_at IS NULL
+    GROUP BY v.id
+    ORDER BY v.created_at DESC
+""")
+
+_EARNINGS_SQL = text("""
+    SELECT 
+        DATE(b.created_at) as date,
+        COUNT(b.id) as bookings_count,
+        SUM(b.total_amount) as daily_earnings
+    FROM bookings b
+    JOIN vehicles v ON b.vehicle_id = v.id
+    WHERE v.owner_id = :owner_id 
+    AND b.status IN ('confirmed', 'completed')
+    AND b.created_at >= :start_date
+    GROUP BY DATE(b.created_at)
+    ORDER BY date DESC
+""")
 
 @router.patch("/bookings/{booking_id}/approve")
 def approve_booking(
-    booking_id: str,
+    booking_id: UUID,
     current_user_data: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Approve a pending booking"""
-    try:
-        booking_uuid = UUID(booking_id)
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid booking ID format"
-        )
-    
     # Check if booking belongs to owner's vehicle
     booking = db.query(Booking).join(VehicleModel).filter(
-        Booking.id == booking_uuid,
+        Booking.id == booking_id,
         VehicleModel.owner_id == current_user_data["user_id"],
         Booking.status == 'pending'
     ).first()
@@ -49,7 +99,7 @@ def approve_booking(
         db.commit()
         
         logger.info(f"Booking approved by owner", extra={
-            "booking_id": str(booking_uuid),
+            "booking_id": str(booking_id),
             "owner_id": current_user_data["user_id"],
             "renter_id": str(booking.renter_id),
             "vehicle_id": str(booking.vehicle_id),
@@ -62,7 +112,7 @@ def approve_booking(
     except Exception as e:
         db.rollback()
         log_error(logger, e, {
-            "booking_id": str(booking_uuid),
+            "booking_id": str(booking_id),
             "owner_id": current_user_data["user_id"]
         }, "booking_approval_error")
         raise HTTPException(
@@ -72,22 +122,14 @@ def approve_booking(
 
 @router.patch("/bookings/{booking_id}/reject")
 def reject_booking(
-    booking_id: str,
+    booking_id: UUID,
     reason: str = Query(..., min_length=1, max_length=500),
     current_user_data: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Reject a pending booking"""
-    try:
-        booking_uuid = UUID(booking_id)
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid booking ID format"
-        )
-    
     booking = db.query(Booking).join(VehicleModel).filter(
-        Booking.id == booking_uuid,
+        Booking.id == booking_id,
         VehicleModel.owner_id == current_user_data["user_id"],
         Booking.status == 'pending'
     ).first()
@@ -106,7 +148,7 @@ def reject_booking(
         db.commit()
         
         logger.info(f"Booking rejected by owner", extra={
-            "booking_id": str(booking_uuid),
+            "booking_id": str(booking_id),
             "owner_id": current_user_data["user_id"],
             "renter_id": str(booking.renter_id),
             "vehicle_id": str(booking.vehicle_id),
@@ -119,7 +161,7 @@ def reject_booking(
     except Exception as e:
         db.rollback()
         log_error(logger, e, {
-            "booking_id": str(booking_uuid),
+            "booking_id": str(booking_id),
             "owner_id": current_user_data["user_id"],
             "reason": reason
         }, "booking_rejection_error")
@@ -136,24 +178,11 @@ def get_pending_bookings(
     """Get all pending bookings for owner's vehicles"""
     owner_id = current_user_data["user_id"]
     
-    bookings_sql = """
-        SELECT 
-            b.id, b.start_time, b.end_time, b.total_amount, b.created_at,
-            b.pickup_address, b.special_instructions,
-            v.vehicle_type, v.brand, v.model, v.license_plate,
-            u.full_name as renter_name, u.phone_number as renter_phone
-        FROM bookings b
-        JOIN vehicles v ON b.vehicle_id = v.id
-        JOIN users u ON b.renter_id = u.id
-        WHERE v.owner_id = :owner_id AND b.status = 'pending'
-        ORDER BY b.created_at ASC
-    """
-    
-    bookings = db.execute(text(bookings_sql), {"owner_id": owner_id}).fetchall()
+    bookings = db.execute(_PENDING_BOOKINGS_SQL, {"owner_id": owner_id}).fetchall()
     
     return [
         {
-            "booking_id": str(booking.id),
+            "booking_id": booking.id,
             "vehicle" : {
                 "vehicle_type": booking.vehicle_type,
                 "brand": booking.brand,
@@ -164,12 +193,12 @@ def get_pending_bookings(
                 "name": booking.renter_name,
                 "phone": booking.renter_phone
             },
-            "start_time": booking.start_time.isoformat(),
-            "end_time": booking.end_time.isoformat(),
+            "start_time": booking.start_time,
+            "end_time": booking.end_time,
             "total_amount": float(booking.total_amount),
             "pickup_address": booking.pickup_address,
             "special_instructions": booking.special_instructions,
-            "created_at": booking.created_at.isoformat()
+            "created_at": booking.created_at
         }
         for booking in bookings
     ]
@@ -182,24 +211,11 @@ def get_active_bookings(
     """Get all active/confirmed bookings for owner's vehicles"""
     owner_id = current_user_data["user_id"]
     
-    bookings_sql = """
-        SELECT 
-            b.id, b.start_time, b.end_time, b.status, b.total_amount, b.created_at,
-            b.pickup_address, b.dropoff_address,
-            v.vehicle_type, v.brand, v.model, v.license_plate,
-            u.full_name as renter_name, u.phone_number as renter_phone
-        FROM bookings b
-        JOIN vehicles v ON b.vehicle_id = v.id
-        JOIN users u ON b.renter_id = u.id
-        WHERE v.owner_id = :owner_id AND b.status IN ('confirmed', 'active')
-        ORDER BY b.start_time ASC
-    """
-    
-    bookings = db.execute(text(bookings_sql), {"owner_id": owner_id}).fetchall()
+    bookings = db.execute(_ACTIVE_BOOKINGS_SQL, {"owner_id": owner_id}).fetchall()
     
     return [
         {
-            "id": str(booking.id),
+            "id": booking.id,
             "vehicle" : {
                 "vehicle_type": booking.vehicle_type,
                 "brand": booking.brand,
@@ -210,13 +226,13 @@ def get_active_bookings(
                 "name": booking.renter_name,
                 "phone": booking.renter_phone
             },
-            "start_time": booking.start_time.isoformat(),
-            "end_time": booking.end_time.isoformat(),
+            "start_time": booking.start_time,
+            "end_time": booking.end_time,
             "status": booking.status.upper(),
             "total_amount": float(booking.total_amount),
             "pickup_address": booking.pickup_address,
             "dropoff_address": booking.dropoff_address,
-            "created_at": booking.created_at.isoformat()
+            "created_at": booking.created_at
         }
         for booking in bookings
     ]
@@ -229,27 +245,12 @@ def get_owner_vehicles(
     """Get all vehicles owned by current user with booking stats"""
     owner_id = current_user_data["user_id"]
     
-    vehicles_sql = """
-        SELECT 
-            v.id, v.brand, v.model, v.vehicle_type, v.color, v.year, 
-            v.license_plate, v.available, v.created_at,
-            COUNT(b.id) as total_bookings,
-            COUNT(CASE WHEN b.status = 'pending' THEN 1 END) as pending_bookings,
-            COUNT(CASE WHEN b.status IN ('confirmed', 'active') THEN 1 END) as active_bookings,
-            COALESCE(SUM(CASE WHEN b.status IN ('confirmed', 'completed') THEN b.total_amount END), 0) as total_earnings
-        FROM vehicles v
-        LEFT JOIN bookings b ON v.id = b.vehicle_id
-        WHERE v.owner_id = :owner_id AND v.deleted_at IS NULL
-        GROUP BY v.id
-        ORDER BY v.created_at DESC
-    """
-    
-    vehicles = db.execute(text(vehicles_sql), {"owner_id": owner_id}).fetchall()
+    vehicles = db.execute(_OWNER_VEHICLES_SQL, {"owner_id": owner_id}).fetchall()
     
     return {
         "vehicles": [
             {
-                "id": str(vehicle.id),
+                "id": vehicle.id,
                 "name": f"{vehicle.brand} {vehicle.model}",
                 "vehicle_type": vehicle.vehicle_type,
                 "color": vehicle.color,
@@ -262,7 +263,7 @@ def get_owner_vehicles(
                     "active_bookings": vehicle.active_bookings,
                     "total_earnings": float(vehicle.total_earnings)
                 },
-                "created_at": vehicle.created_at.isoformat()
+                "created_at": vehicle.created_at
             }
             for vehicle in vehicles
         ]
@@ -270,54 +271,56 @@ def get_owner_vehicles(
 
 @router.patch("/vehicles/{vehicle_id}/toggle-availability")
 def toggle_vehicle_availability(
-    vehicle_id: str,
+    vehicle_id: UUID,
     current_user_data: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Toggle vehicle availability"""
     try:
-        vehicle_uuid = UUID(vehicle_id)
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid vehicle ID format"
-        )
-    
-    vehicle = db.query(VehicleModel).filter(
-        VehicleModel.id == vehicle_uuid,
-        VehicleModel.owner_id == current_user_data["user_id"],
-        VehicleModel.deleted_at.is_(None)
-    ).first()
-    
-    if not vehicle:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Vehicle not found"
-        )
-    
-    old_status = vehicle.available
-    vehicle.available = not vehicle.available
-    
-    try:
+        # Single atomic UPDATE; RETURNING carries back the new state so no
+        # prior SELECT (or follow-up refresh) is needed
+        row = db.execute(
+            update(VehicleModel)
+            .where(
+                VehicleModel.id == vehicle_id,
+                VehicleModel.owner_id == current_user_data["user_id"],
+                VehicleModel.deleted_at.is_(None)
+            )
+            .values(available=~VehicleModel.available)
+            .returning(VehicleModel.available, VehicleModel.brand, VehicleModel.model)
+        ).first()
+
+        if not row:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Vehicle not found"
+            )
+
         db.commit()
-        
+
+        new_status = row.available
+
         logger.info(f"Vehicle availability toggled", extra={
-            "vehicle_id": str(vehicle_uuid),
+            "vehicle_id": str(vehicle_id),
             "owner_id": current_user_data["user_id"],
-            "old_status": old_status,
-            "new_status": vehicle.available,
-            "vehicle_info": f"{vehicle.brand} {vehicle.model}"
+            "old_status": not new_status,
+            "new_status": new_status,
+            "vehicle_info": f"{row.brand} {row.model}"
         })
-        
+
         return {
-            "message": f"Vehicle {'activated' if vehicle.available else 'deactivated'} successfully",
-            "available": vehicle.available
+            "message": f"Vehicle {'activated' if new_status else 'deactivated'} successfully",
+            "available": new_status
         }
+
+    except HTTPException:
+        raise
     
     except Exception as e:
         db.rollback()
         log_error(logger, e, {
-            "vehicle_id": str(vehicle_uuid),
+            "vehicle_id": str(vehicle_id),
             "owner_id": current_user_data["user_id"]
         }, "vehicle_availability_toggle_error")
         raise HTTPException(
@@ -343,21 +346,7 @@ def get_earnings_summary(
     else:  # year
         start_date = now - timedelta(days=365)
     
-    earnings_sql = """
-        SELECT 
-            DATE(b.created_at) as date,
-            COUNT(b.id) as bookings_count,
-            SUM(b.total_amount) as daily_earnings
-        FROM bookings b
-        JOIN vehicles v ON b.vehicle_id = v.id
-        WHERE v.owner_id = :owner_id 
-        AND b.status IN ('confirmed', 'completed')
-        AND b.created_at >= :start_date
-        GROUP BY DATE(b.created_at)
-        ORDER BY date DESC
-    """
-    
-    earnings = db.execute(text(earnings_sql), {
+    earnings = db.execute(_EARNINGS_SQL, {
         "owner_id": owner_id,
         "start_date": start_date
     }).fetchall()
@@ -371,7 +360,7 @@ def get_earnings_summary(
         "total_bookings": total_bookings,
         "daily_breakdown": [
             {
-                "date": earning.date.isoformat(),
+                "date": earning.date,
                 "bookings": earning.bookings_count,
                 "earnings": float(earning.daily_earnings)
             }
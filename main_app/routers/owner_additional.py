@@ -1,39 +1,27 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import text, update
 from uuid import UUID
 from datetime import datetime, timezone
 from ..db import get_db
 from ..models import Booking, VehicleModel, VehiclePricing
+from ..schemas import BookingStatusUpdate, VehicleAvailabilityUpdate, VehicleRatesUpdate
 from ..auth import get_current_user
 
 router = APIRouter(prefix="/owner", tags=["owner"])
 
 @router.put("/bookings/{booking_id}/status")
 def update_booking_status(
-    booking_id: str,
-    status_data: dict,
+    booking_id: UUID,
+    status_data: BookingStatusUpdate,
     current_user_data: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Update booking status (CONFIRMED/REJECTED)"""
-    try:
-        booking_uuid = UUID(booking_id)
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid booking ID format"
-        )
-    
-    new_status = status_data.get("status")
-    if new_status not in ["CONFIRMED", "REJECTED"]:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Status must be CONFIRMED or REJECTED"
-        )
-    
+    new_status = status_data.status
+
     booking = db.query(Booking).join(VehicleModel).filter(
-        Booking.id == booking_uuid,
+        Booking.id == booking_id,
         VehicleModel.owner_id == current_user_data["user_id"],
         Booking.status == 'pending'
     ).first()
@@ -59,42 +47,35 @@ def update_booking_status(
 
 @router.put("/vehicles/{vehicle_id}/availability")
 def update_vehicle_availability(
-    vehicle_id: str,
-    availability_data: dict,
+    vehicle_id: UUID,
+    availability_data: VehicleAvailabilityUpdate,
     current_user_data: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Update vehicle availability"""
-    try:
-        vehicle_uuid = UUID(vehicle_id)
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid vehicle ID format"
-        )
-    
-    is_available = availability_data.get("is_available")
-    if not isinstance(is_available, bool):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="is_available must be a boolean"
+    is_available = availability_data.is_available
+
+    # Single atomic UPDATE instead of SELECT-then-modify
+    updated = db.execute(
+        update(VehicleModel)
+        .where(
+            VehicleModel.id == vehicle_id,
+            VehicleModel.owner_id == current_user_data["user_id"],
+            VehicleModel.deleted_at.is_(None)
         )
-    
-    vehicle = db.query(VehicleModel).filter(
-        VehicleModel.id == vehicle_uuid,
-        VehicleModel.owner_id == current_user_data["user_id"],
-        VehicleModel.deleted_at.is_(None)
+        .values(available=is_available)
+        .returning(VehicleModel.id)
     ).first()
-    
-    if not vehicle:
+
+    if not updated:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Vehicle not found"
         )
-    
-    vehicle.available = is_available
+
     db.commit()
-    
+
     return {
         "message": f"Vehicle {'activated' if is_available else 'deactivated'} successfully",
         "is_available": is_available
@@ -102,37 +83,17 @@ def update_vehicle_availability(
 
 @router.put("/vehicles/{vehicle_id}/rates")
 def update_vehicle_rates(
-    vehicle_id: str,
-    rates_data: dict,
+    vehicle_id: UUID,
+    rates_data: VehicleRatesUpdate,
     current_user_data: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Update vehicle hourly and daily rates"""
-    try:
-        vehicle_uuid = UUID(vehicle_id)
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid vehicle ID format"
-        )
-    
-    hourly_rate = rates_data.get("hourly_rate")
-    daily_rate = rates_data.get("daily_rate")
-    
-    if hourly_rate is not None and (not isinstance(hourly_rate, (int, float)) or hourly_rate <= 0):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="hourly_rate must be a positive number"
-        )
-    
-    if daily_rate is not None and (not isinstance(daily_rate, (int, float)) or daily_rate <= 0):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="daily_rate must be a positive number"
-        )
-    
+    hourly_rate = rates_data.hourly_rate
+    daily_rate = rates_data.daily_rate
+
     vehicle = db.query(VehicleModel).filter(
-        VehicleModel.id == vehicle_uuid,
+        VehicleModel.id == vehicle_id,
         VehicleModel.owner_id == current_user_data["user_id"],
         VehicleModel.deleted_at.is_(None)
     ).first()
@@ -145,7 +106,7 @@ def update_vehicle_rates(
     
     # Update or create pricing
     pricing = db.query(VehiclePricing).filter(
-        VehiclePricing.vehicle_id == vehicle_uuid
+        VehiclePricing.vehicle_id == vehicle_id
     ).first()
     
     if pricing:
@@ -156,7 +117,7 @@ def update_vehicle_rates(
         pricing.updated_at = datetime.now(timezone.utc)
     else:
         pricing = VehiclePricing(
-            vehicle_id=vehicle_uuid,
+            vehicle_id=vehicle_id,
             base_hourly_rate=hourly_rate or 0,
             daily_rate=daily_rate
         )
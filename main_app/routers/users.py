@@ -1,22 +1,97 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.orm import load_only
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, text
 from sqlalchemy.exc import IntegrityError
-from datetime import datetime, timedelta, timezone
 from typing import List
-from ..db import get_db
-from ..models import User, VehicleModel
+from ..db import get_async_db, get_constraint_name
+from ..models import User, VehicleModel, VehiclePhoto
 from ..schemas import UserRegister, UserResponse, SendOTP, VerifyOTP, Token, OTPResponse, VehicleResponse
-from ..auth import generate_otp, is_otp_valid, create_access_token, OTP_EXPIRE_MINUTES, ACCESS_TOKEN_EXPIRE_DAYS, get_current_user
-from geoalchemy2.functions import ST_X, ST_Y
+from ..auth import generate_otp, create_access_token, OTP_EXPIRE_MINUTES, ACCESS_TOKEN_EXPIRE_DAYS, get_current_user
 from ..logging_config import get_logger, log_error
-from ..sms_service import sms_service
+from ..redis_client import redis_client
+from ..sms_service import get_sms_service
+import hmac
+import orjson
 
 logger = get_logger(__name__)
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+# Derived once; the handlers only ever need these in seconds
+_OTP_EXPIRE_SECONDS = OTP_EXPIRE_MINUTES * 60
+_ACCESS_TOKEN_EXPIRE_SECONDS = ACCESS_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
+
+# Coordinates come from the stored generated columns, so the read costs
+# nothing beyond the heap tuple fetch
+_USER_VEHICLES_SQL = text("""
+    SELECT v.id, v.owner_id, v.brand, v.model,
+           v.latitude, v.longitude,
+           v.available, v.vehicle_type, v.color, v.license_plate,
+           v.year, v.created_at
+    FROM vehicles v
+    WHERE v.owner_id = :owner_id
+    AND v.deleted_at IS NULL
+    AND v.available = true
+    ORDER BY v.created_at DESC
+    LIMIT :limit OFFSET :offset
+""")
+
+# OTP endpoint abuse is shed at a single Redis counter op before any DB
+# work; counters share a window per phone/IP and expire on their own
+_OTP_RATE_WINDOW_SECONDS = 600
+_MAX_OTP_SENDS_PER_PHONE = 3
+_MAX_OTP_SENDS_PER_IP = 20
+_MAX_OTP_VERIFY_ATTEMPTS = 5
+
+# INCR and the first-hit EXPIRE run as one server-side script, so a crash
+# between them can never leave a counter without a TTL (which would lock
+# out a phone/IP permanently once it crossed the limit)
+_RATE_LIMIT_SCRIPT = redis_client.register_script("""
+local count = redis.call('INCR', KEYS[1])
+if count == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+return count
+""")
+
+async def _under_rate_limit(key: str, limit: int, window_seconds: int) -> bool:
+    """Bump an INCR counter with a TTL set on first hit; True while under the limit."""
+    count = await _RATE_LIMIT_SCRIPT(keys=[key], args=[window_seconds])
+    return count <= limit
+
+async def enforce_send_otp_rate_limit(otp_data: SendOTP, request: Request):
+    """Per-phone and per-IP limits on OTP sends"""
+    phone_key = f"rate:otp_send:phone:{otp_data.phone_number}"
+    if not await _under_rate_limit(phone_key, _MAX_OTP_SENDS_PER_PHONE, _OTP_RATE_WINDOW_SECONDS):
+        logger.warning(f"OTP send rate limit hit for phone", extra={"phone_number": otp_data.phone_number})
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many OTP requests. Please try again later"
+        )
+
+    if request.client:
+        ip_key = f"rate:otp_send:ip:{request.client.host}"
+        if not await _under_rate_limit(ip_key, _MAX_OTP_SENDS_PER_IP, _OTP_RATE_WINDOW_SECONDS):
+            logger.warning(f"OTP send rate limit hit for IP", extra={"client_ip": request.client.host})
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many OTP requests. Please try again later"
+            )
+
+async def enforce_verify_otp_rate_limit(otp_data: VerifyOTP):
+    """Cap verify attempts per phone; burn the pending OTP once exceeded"""
+    attempts_key = f"rate:otp_verify:{otp_data.phone_number}"
+    if not await _under_rate_limit(attempts_key, _MAX_OTP_VERIFY_ATTEMPTS, _OTP_EXPIRE_SECONDS):
+        await redis_client.delete(f"otp:{otp_data.phone_number}")
+        logger.warning(f"OTP verify rate limit hit", extra={"phone_number": otp_data.phone_number})
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many verification attempts. Please request a new OTP"
+        )
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register_user(user_data: UserRegister, db: Session = Depends(get_db)):
+async def register_user(user_data: UserRegister, db: AsyncSession = Depends(get_async_db)):
     """Register a new user with phone number"""
     logger.info(f"User registration attempt", extra={"phone_number": user_data.phone_number, "email": user_data.email})
     
@@ -27,21 +102,26 @@ def register_user(user_data: UserRegister, db: Session = Depends(get_db)):
             email=user_data.email
         )
         db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        await db.commit()
+        await db.refresh(db_user)
         
         logger.info(f"User registered successfully", extra={"user_id": str(db_user.id), "phone_number": user_data.phone_number})
         return db_user
     
     except IntegrityError as e:
-        db.rollback()
-        if "phone_number" in str(e.orig):
+        await db.rollback()
+        # The driver-reported constraint name is preferred, but its exact
+        # spelling depends on how the table was created (Postgres default
+        # *_key vs SQLAlchemy's ix_* unique indexes), so fall back to the
+        # error text and match on the column name either way
+        constraint = get_constraint_name(e) or str(getattr(e, "orig", e))
+        if "phone_number" in constraint:
             logger.warning(f"Registration failed - phone number already exists", extra={"phone_number": user_data.phone_number})
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="Phone number already registered"
             )
-        elif "email" in str(e.orig):
+        elif "email" in constraint:
             logger.warning(f"Registration failed - email already exists", extra={"email": user_data.email})
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
@@ -54,21 +134,21 @@ def register_user(user_data: UserRegister, db: Session = Depends(get_db)):
         )
     
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         log_error(logger, e, {"phone_number": user_data.phone_number}, "user_registration_unexpected_error")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Registration failed due to server error"
         )
 
-@router.post("/send-otp", response_model=OTPResponse)
-def send_otp(otp_data: SendOTP, db: Session = Depends(get_db)):
+@router.post("/send-otp", response_model=OTPResponse, dependencies=[Depends(enforce_send_otp_rate_limit)])
+async def send_otp(otp_data: SendOTP, db: AsyncSession = Depends(get_async_db)):
     """Send OTP to phone number"""
     logger.info(f"OTP request", extra={"phone_number": otp_data.phone_number})
     
     try:
-        user = db.query(User).filter(User.phone_number == otp_data.phone_number).first()
-        
+        user = await db.scalar(select(User).where(User.phone_number == otp_data.phone_number))
+
         if not user:
             logger.warning(f"OTP request for unregistered phone number", extra={"phone_number": otp_data.phone_number})
             raise HTTPException(
@@ -84,17 +164,17 @@ def send_otp(otp_data: SendOTP, db: Session = Depends(get_db)):
             )
         
         otp_code = generate_otp()
-        otp_expires_at = datetime.now(timezone.utc) + timedelta(minutes=OTP_EXPIRE_MINUTES)
-        
-        user.otp_code = otp_code
-        user.otp_expires_at = otp_expires_at
-        db.commit()
-        
+
+        # OTPs are short-lived and throwaway, so they live in Redis with a
+        # TTL instead of forcing a users-row UPDATE on every send
+        await redis_client.set(f"otp:{otp_data.phone_number}", otp_code, ex=_OTP_EXPIRE_SECONDS)
+
+
         logger.info(f"OTP generated successfully", extra={"phone_number": otp_data.phone_number, "user_id": str(user.id)})
         
         # TODO: Send OTP via SMS service (Twilio, AWS SNS, etc.)
         print(f"OTP for {otp_data.phone_number}: {otp_code}")  # Remove in production
-        # sms_sent = sms_service.send_otp(otp_data.phone_number, otp_code)
+        # sms_sent = await get_sms_service().send_otp_async(otp_data.phone_number, otp_code)
         # if not sms_sent:
         #     logger.error(f"Failed to send OTP SMS", extra={"phone_number": otp_data.phone_number, "user_id": str(user.id)})
         #     raise HTTPException(
@@ -104,7 +184,7 @@ def send_otp(otp_data: SendOTP, db: Session = Depends(get_db)):
         
         return {
             "message": "OTP sent successfully",
-            "expires_in": OTP_EXPIRE_MINUTES * 60
+            "expires_in": _OTP_EXPIRE_SECONDS
         }
     
     except HTTPException:
@@ -116,14 +196,14 @@ def send_otp(otp_data: SendOTP, db: Session = Depends(get_db)):
             detail="Failed to send OTP"
         )
 
-@router.post("/verify-otp", response_model=Token)
-def verify_otp(otp_data: VerifyOTP, db: Session = Depends(get_db)):
+@router.post("/verify-otp", response_model=Token, dependencies=[Depends(enforce_verify_otp_rate_limit)])
+async def verify_otp(otp_data: VerifyOTP, db: AsyncSession = Depends(get_async_db)):
     """Verify OTP and return long-lived JWT token"""
     logger.info(f"OTP verification attempt", extra={"phone_number": otp_data.phone_number})
     
     try:
-        user = db.query(User).filter(User.phone_number == otp_data.phone_number).first()
-        
+        user = await db.scalar(select(User).where(User.phone_number == otp_data.phone_number))
+
         if not user:
             logger.warning(f"OTP verification failed - phone number not registered", extra={"phone_number": otp_data.phone_number})
             raise HTTPException(
@@ -131,32 +211,25 @@ def verify_otp(otp_data: VerifyOTP, db: Session = Depends(get_db)):
                 detail="Phone number not registered"
             )
         
-        if not user.otp_code or not user.otp_expires_at:
-            logger.warning(f"OTP verification failed - no OTP request found", extra={"phone_number": otp_data.phone_number, "user_id": str(user.id)})
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="No OTP request found. Please request OTP first"
-            )
-        
-        if not is_otp_valid(user.otp_expires_at):
-            logger.warning(f"OTP verification failed - expired OTP", extra={"phone_number": otp_data.phone_number, "user_id": str(user.id)})
+        # GETDEL consumes the OTP atomically, so a code can never be
+        # replayed even by concurrent verify requests; expiry is handled
+        # by the Redis TTL set on send
+        stored_otp = await redis_client.getdel(f"otp:{otp_data.phone_number}")
+
+        if stored_otp is None:
+            logger.warning(f"OTP verification failed - no OTP request found or OTP expired", extra={"phone_number": otp_data.phone_number, "user_id": str(user.id)})
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="OTP has expired. Please request a new one"
+                detail="No valid OTP found. Please request a new one"
             )
-        
-        if user.otp_code != otp_data.otp_code:
+
+        if not hmac.compare_digest(stored_otp, otp_data.otp_code):
             logger.warning(f"OTP verification failed - invalid OTP", extra={"phone_number": otp_data.phone_number, "user_id": str(user.id), "provided_otp": otp_data.otp_code})
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid OTP"
             )
-        
-        # Clear OTP after successful verification
-        user.otp_code = None
-        user.otp_expires_at = None
-        db.commit()
-        
+
         access_token = create_access_token(
             data={"sub": str(user.id), "phone": user.phone_number}
         )
@@ -166,7 +239,7 @@ def verify_otp(otp_data: VerifyOTP, db: Session = Depends(get_db)):
         return {
             "access_token": access_token,
             "token_type": "bearer",
-            "expires_in": ACCESS_TOKEN_EXPIRE_DAYS * 24 * 60 * 60,
+            "expires_in": _ACCESS_TOKEN_EXPIRE_SECONDS,
             "user": user
         }
     
@@ -179,14 +252,40 @@ def verify_otp(otp_data: VerifyOTP, db: Session = Depends(get_db)):
             detail="OTP verification failed"
         )
 
-def get_current_user_from_db(current_user_data: dict = Depends(get_current_user), db: Session = Depends(get_db)):
-    """Get current user from database"""
-    user = db.query(User).filter(User.id == current_user_data["user_id"]).first()
+# Auth lookups repeat on every protected request; a short TTL keeps the
+# cache fresh enough for is_active checks while shedding almost all of them
+_USER_CACHE_TTL_SECONDS = 30
+
+async def get_current_user_from_db(current_user_data: dict = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    """Get current user from database (Redis cache-aside)"""
+    cache_key = f"user:{current_user_data['user_id']}"
+
+    cached = await redis_client.get(cache_key)
+    if cached:
+        return User(**orjson.loads(cached))
+
+    # Only the columns UserResponse (and the cache entry) actually use;
+    # skips hydrating the OTP and timestamp columns on every auth check
+    user = await db.scalar(
+        select(User).options(
+            load_only(User.id, User.phone_number, User.full_name, User.email, User.is_verified, User.is_active)
+        ).where(User.id == current_user_data["user_id"])
+    )
     if not user or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found or inactive"
         )
+
+    await redis_client.set(cache_key, orjson.dumps({
+        "id": str(user.id),
+        "phone_number": user.phone_number,
+        "full_name": user.full_name,
+        "email": user.email,
+        "is_verified": user.is_verified,
+        "is_active": user.is_active
+    }), ex=_USER_CACHE_TTL_SECONDS)
+
     return user
 
 @router.get("/profile", response_model=UserResponse)
@@ -195,41 +294,52 @@ def get_profile(current_user: User = Depends(get_current_user_from_db)):
     return current_user
 
 @router.get("/vehicles", response_model=List[VehicleResponse])
-def get_user_vehicles(current_user: User = Depends(get_current_user_from_db), db: Session = Depends(get_db)):
+async def get_user_vehicles(
+    current_user: User = Depends(get_current_user_from_db),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_db)
+):
     """Get all vehicles registered by current user"""
-    vehicles = db.query(VehicleModel).filter(
-        VehicleModel.owner_id == current_user.id,
-        VehicleModel.deleted_at.is_(None),
-        VehicleModel.available.is_(True)
-    ).all()
-    
+    vehicles = (await db.execute(_USER_VEHICLES_SQL, {
+        "owner_id": str(current_user.id),
+        "limit": limit,
+        "offset": offset
+    })).fetchall()
+
+    # One IN (...) query for all photos instead of one query per vehicle
+    photos_by_vehicle = {}
+    if vehicles:
+        photo_rows = (await db.scalars(
+            select(VehiclePhoto).where(VehiclePhoto.vehicle_id.in_([vehicle.id for vehicle in vehicles]))
+        )).all()
+        for photo in photo_rows:
+            photos_by_vehicle.setdefault(photo.vehicle_id, []).append(photo)
+
     result = []
     for vehicle in vehicles:
-        lat = db.scalar(ST_Y(vehicle.location))
-        lng = db.scalar(ST_X(vehicle.location))
-        
         result.append({
             "id": vehicle.id,
             "owner_id": vehicle.owner_id,
             "brand": vehicle.brand,
             "model": vehicle.model,
-            "latitude": lat,
-            "longitude": lng,
+            "latitude": vehicle.latitude,
+            "longitude": vehicle.longitude,
             "available": vehicle.available,
             "vehicle_type": vehicle.vehicle_type,
             "color": vehicle.color,
             "license_plate": vehicle.license_plate,
             "year": vehicle.year,
             "created_at": vehicle.created_at,
-            "photos": vehicle.photo_list
+            "photos": photos_by_vehicle.get(vehicle.id, [])
         })
-    
+
     return result
 
 @router.get("/{user_id}", response_model=UserResponse)
-def get_user(user_id: str, db: Session = Depends(get_db)):
+async def get_user(user_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get user by ID"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
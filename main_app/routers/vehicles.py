@@ -1,16 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
-from sqlalchemy import text
-from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, UploadFile, File
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, insert, select, text, update
+from sqlalchemy.exc import IntegrityError
 from geoalchemy2.elements import WKTElement
-from geoalchemy2.functions import ST_X, ST_Y
 from uuid import UUID
 from typing import List
 from datetime import datetime, timezone
+import asyncio
+import orjson
 import uuid
 from supabase import create_client, Client
 import os
-from ..db import get_db
+from ..db import get_async_db, get_constraint_name
+from ..redis_client import redis_client
 from ..models import VehicleModel, VehiclePhoto, VehiclePricing, VehicleAvailabilitySlot, Booking
 from ..schemas import Vehicle, VehicleResponse, SetAvailabilityRequest, AvailabilitySlotResponse
 from ..auth import get_current_user
@@ -24,47 +26,120 @@ supabase: Client = create_client(supabase_url, supabase_service_key)
 router = APIRouter(prefix="/vehicles", tags=["vehicles"])
 logger = get_logger("vehicles")
 
+# Hot-path statements are constructed once at import so SQLAlchemy's
+# compiled-statement cache keys on the same object for every request
+_SEARCH_SQL = text("""
+    SELECT v.id, v.owner_id, v.vehicle_type, v.brand, v.model,
+           ST_AsText(v.location::geometry) as location, v.color, v.year,
+           v.available, v.created_at, u.full_name as owner_name,
+           ROUND(ST_Distance(v.location::geography, ST_GeogFromText(:point))::numeric, 0) as distance_meters,
+           MIN(vas.hourly_rate) as hourly_rate,
+           MIN(vas.daily_rate) as daily_rate,
+           MIN(vas.weekly_rate) as weekly_rate,
+           COALESCE((
+               SELECT json_agg(json_build_object('id', vp.id, 'photo_url', vp.photo_url, 'is_primary', vp.is_primary))
+               FROM vehicle_photos vp WHERE vp.vehicle_id = v.id
+           ), '[]'::json) as photos
+    FROM vehicles v
+    JOIN users u ON v.owner_id = u.id
+    JOIN vehicle_availability_slots vas ON vas.vehicle_id = v.id
+    WHERE ST_DWithin(v.location::geography, ST_GeogFromText(:point), :radius)
+    AND v.available = true
+    AND v.deleted_at IS NULL
+    AND vas.is_active = true
+    AND vas.start_datetime <= :start_time
+    AND vas.end_datetime >= :end_time
+    AND NOT EXISTS (
+        SELECT 1 FROM bookings b
+        WHERE b.vehicle_id = v.id
+        AND b.status IN ('confirmed', 'active')
+        AND NOT (b.end_time <= :start_time OR b.start_time >= :end_time)
+    )
+    GROUP BY v.id, v.owner_id, v.vehicle_type, v.brand, v.model, v.location,
+             v.color, v.year, v.available, v.created_at, u.full_name
+    ORDER BY distance_meters
+    LIMIT 50
+""")
+
+# The search point is parsed once in the CTE and the distance computed
+# once per row in the subselect. The inner ORDER BY uses the KNN operator
+# so the GiST index is walked in distance order and the scan stops at the
+# page boundary, instead of sorting every candidate in the radius.
+_NEARBY_SQL = text("""
+    WITH p AS (SELECT ST_GeogFromText(:point) AS g)
+    SELECT v.id, v.owner_id, v.vehicle_type, v.brand, v.model, ST_AsText(v.location::geometry) as location,
+    v.color, v.year, v.available, v.created_at, u.full_name as owner_name,
+    ROUND(v.d::numeric, 0)::float8 as distance_meters
+    FROM (
+        SELECT v.*, ST_Distance(v.location::geography, p.g) AS d
+        FROM vehicles v, p
+        WHERE ST_DWithin(v.location::geography, p.g, :radius)
+        AND v.available = true
+        AND v.deleted_at IS NULL
+        AND v.owner_id != :user_id
+        AND EXISTS (
+            SELECT 1 FROM vehicle_availability_slots vas
+            WHERE vas.vehicle_id = v.id
+            AND vas.end_datetime > NOW()
+            AND vas.is_active = true
+        )
+        ORDER BY v.location::geography <-> p.g
+        LIMIT :limit OFFSET :offset
+    ) v
+    JOIN users u ON v.owner_id = u.id
+    ORDER BY v.d
+""")
+
+# Coordinates come from the stored generated columns, so the read costs
+# nothing beyond the heap tuple fetch
+_VEHICLE_DETAILS_SQL = text("""
+    SELECT v.id, v.owner_id, v.brand, v.model,
+           v.latitude, v.longitude,
+           v.available, v.vehicle_type, v.color, v.license_plate,
+           v.year, v.created_at,
+           COALESCE((
+               SELECT json_agg(json_build_object('id', vp.id, 'photo_url', vp.photo_url, 'is_primary', vp.is_primary))
+               FROM vehicle_photos vp WHERE vp.vehicle_id = v.id
+           ), '[]'::json) as photos
+    FROM vehicles v
+    WHERE v.id = :vehicle_id AND v.deleted_at IS NULL
+""")
+
 @router.post("/register")
-def register_vehicle(vehicle: Vehicle, owner_id: str, db: Session = Depends(get_db)):
+async def register_vehicle(vehicle: Vehicle, owner_id: str, db: AsyncSession = Depends(get_async_db)):
     """Register a new vehicle with user-friendly error messages"""
     log_api_request(logger, "POST", "/vehicles/register", owner_id)
     
+    point_wkt = WKTElement(f'POINT({vehicle.longitude} {vehicle.latitude})', srid=4326)
+    db_vehicle = VehicleModel(
+        owner_id=owner_id,
+        brand=vehicle.brand,
+        model=vehicle.model,
+        location=point_wkt,
+        available=vehicle.available,
+        vehicle_type=vehicle.vehicle_type,
+        color=vehicle.color,
+        license_plate=vehicle.license_plate.upper(),
+        year=vehicle.year
+    )
+    db.add(db_vehicle)
+    # The constraint-specific messages stay here; anything else falls
+    # through to the app-level SQLAlchemyError handler
     try:
-        point_wkt = WKTElement(f'POINT({vehicle.longitude} {vehicle.latitude})', srid=4326)
-        db_vehicle = VehicleModel(
-            owner_id=owner_id,
-            brand=vehicle.brand,
-            model=vehicle.model,
-            location=point_wkt,
-            available=vehicle.available,
-            vehicle_type=vehicle.vehicle_type,
-            color=vehicle.color,
-            license_plate=vehicle.license_plate.upper(),
-            year=vehicle.year
-        )
-        db.add(db_vehicle)
-        db.commit()
-        db.refresh(db_vehicle)
-        
-        log_database_operation(logger, "INSERT", "vehicles", owner_id, str(db_vehicle.id))
-        log_business_event(logger, "vehicle_registered", {
-            "vehicle_id": str(db_vehicle.id),
-            "owner_id": owner_id,
-            "brand": vehicle.brand,
-            "model": vehicle.model
-        })
-        
-        return {"status": "success", "vehicle_id": str(db_vehicle.id)}
-    
+        await db.commit()
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         log_error(logger, e, {"owner_id": owner_id, "license_plate": vehicle.license_plate}, "vehicle_registration")
-        if "license_plate" in str(e.orig):
+        # Prefer the driver-reported constraint name, but its exact
+        # spelling depends on how the table was created, so fall back to
+        # the error text and match on the column name either way
+        constraint = get_constraint_name(e) or str(getattr(e, "orig", e))
+        if "license_plate" in constraint:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="This license plate is already registered. Please check and enter the correct license plate."
             )
-        elif "owner_id" in str(e.orig):
+        elif "owner_id" in constraint:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Your session has expired. Please log in again to register your vehicle."
@@ -73,346 +148,302 @@ def register_vehicle(vehicle: Vehicle, owner_id: str, db: Session = Depends(get_
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Vehicle information conflicts with existing data. Please check your details."
         )
-    
-    except SQLAlchemyError as e:
-        db.rollback()
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Unable to connect to server. Please check your internet connection and try again."
-        )
-    
-    except Exception as e:
-        db.rollback()
-        log_error(logger, e, {"owner_id": owner_id}, "vehicle_registration")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="An unexpected error occurred. Please try again."
-        )
+
+    await db.refresh(db_vehicle)
+
+    log_database_operation(logger, "INSERT", "vehicles", owner_id, str(db_vehicle.id))
+    log_business_event(logger, "vehicle_registered", {
+        "vehicle_id": str(db_vehicle.id),
+        "owner_id": owner_id,
+        "brand": vehicle.brand,
+        "model": vehicle.model
+    })
+
+    return {"status": "success", "vehicle_id": str(db_vehicle.id)}
 
 @router.get("/search")
-def search_available_vehicles(
+async def search_available_vehicles(
     lat: float,
     lng: float,
     start_datetime: str,
     end_datetime: str,
     radius_km: float = 10,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Search vehicles available for specific dates and location"""
+    # Validate coordinates
+    if not (-90 <= lat <= 90) or not (-180 <= lng <= 180):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid coordinates"
+        )
+
+    # Parse datetime strings
     try:
-        # Validate coordinates
-        if not (-90 <= lat <= 90) or not (-180 <= lng <= 180):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid coordinates"
-            )
-        
-        # Parse datetime strings
-        try:
-            start_dt = datetime.fromisoformat(start_datetime.replace('Z', '+00:00'))
-            end_dt = datetime.fromisoformat(end_datetime.replace('Z', '+00:00'))
-        except ValueError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid datetime format. Use ISO format"
-            )
-        
-        if start_dt >= end_dt:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Start time must be before end time"
-            )
-        point_wkt = f'SRID=4326;POINT({lng} {lat})'
-        
-        # Find vehicles with availability slots that cover the requested period
-        sql = """
-            SELECT v.id, v.owner_id, v.vehicle_type, v.brand, v.model, 
-                   ST_AsText(v.location::geometry) as location, v.color, v.year, 
-                   v.available, v.created_at, u.full_name as owner_name,
-                   ROUND(ST_Distance(v.location::geography, ST_GeogFromText(:point))::numeric, 0) as distance_meters,
-                   MIN(vas.hourly_rate) as hourly_rate, 
-                   MIN(vas.daily_rate) as daily_rate, 
-                   MIN(vas.weekly_rate) as weekly_rate,
-                   COALESCE((
-                       SELECT json_agg(json_build_object('id', vp.id, 'photo_url', vp.photo_url, 'is_primary', vp.is_primary))
-                       FROM vehicle_photos vp WHERE vp.vehicle_id = v.id
-                   ), '[]'::json) as photos
-            FROM vehicles v
-            JOIN users u ON v.owner_id = u.id
-            JOIN vehicle_availability_slots vas ON vas.vehicle_id = v.id
-            WHERE ST_DWithin(v.location::geography, ST_GeogFromText(:point), :radius)
-            AND v.available = true
-            AND v.deleted_at IS NULL
-            AND vas.is_active = true
-            AND vas.start_datetime <= :start_time
-            AND vas.end_datetime >= :end_time
-            AND NOT EXISTS (
-                SELECT 1 FROM bookings b 
-                WHERE b.vehicle_id = v.id 
-                AND b.status IN ('confirmed', 'active')
-                AND NOT (b.end_time <= :start_time OR b.start_time >= :end_time)
-            )
-            GROUP BY v.id, v.owner_id, v.vehicle_type, v.brand, v.model, v.location, 
-                     v.color, v.year, v.available, v.created_at, u.full_name
-            ORDER BY distance_meters
-            LIMIT 50
-        """
-        
-        result = db.execute(text(sql), {
-            "point": point_wkt, 
-            "radius": radius_km * 1000,
-            "start_time": start_dt,
-            "end_time": end_dt
-        })
-        
-        return result.mappings().all()
-    
-    except HTTPException:
-        raise
-    except Exception as e:
-        log_error(logger, e, {"lat": lat, "lng": lng, "start_datetime": start_datetime, "end_datetime": end_datetime}, "search_available_vehicles")
+        start_dt = datetime.fromisoformat(start_datetime.replace('Z', '+00:00'))
+        end_dt = datetime.fromisoformat(end_datetime.replace('Z', '+00:00'))
+    except ValueError:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Search failed"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid datetime format. Use ISO format"
         )
 
+    if start_dt >= end_dt:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Start time must be before end time"
+        )
+    point_wkt = f'SRID=4326;POINT({lng} {lat})'
+
+    # Find vehicles with availability slots that cover the requested period
+    result = await db.execute(_SEARCH_SQL, {
+        "point": point_wkt,
+        "radius": radius_km * 1000,
+        "start_time": start_dt,
+        "end_time": end_dt
+    })
+
+    return result.mappings().all()
+
 @router.get("/nearby")
-def get_nearby_vehicles(
-    lat: float, 
-    lng: float, 
-    radius_km: float = 5, 
+async def get_nearby_vehicles(
+    lat: float,
+    lng: float,
+    radius_km: float = 5,
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get vehicles within specified radius ordered by distance (excluding own vehicles)"""
-    try:
-        # Validate coordinates
-        if not (-90 <= lat <= 90) or not (-180 <= lng <= 180):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid coordinates"
-            )
-        
-        if radius_km <= 0 or radius_km > 100:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Radius must be between 0 and 100 km"
-            )
-        
-        user_id = current_user["user_id"]
-        point_wkt = f'SRID=4326;POINT({lng} {lat})'
-        
-        # Only show vehicles with future availability slots
-        sql = """
-            SELECT v.id, v.owner_id, v.vehicle_type, v.brand, v.model, ST_AsText(v.location::geometry) as location,
-            v.color, v.year, v.available, v.created_at, u.full_name as owner_name,
-            ROUND(ST_Distance(v.location::geography, ST_GeogFromText(:point))::numeric, 0) as distance_meters
-            FROM vehicles v
-            JOIN users u ON v.owner_id = u.id
-            WHERE ST_DWithin(v.location::geography, ST_GeogFromText(:point), :radius)
-            AND v.available = true
-            AND v.deleted_at IS NULL
-            AND v.owner_id != :user_id
-            AND EXISTS (
-                SELECT 1 FROM vehicle_availability_slots vas 
-                WHERE vas.vehicle_id = v.id 
-                AND vas.end_datetime > NOW()
-                AND vas.is_active = true
-            )
-            ORDER BY ST_Distance(v.location::geography, ST_GeogFromText(:point))
-            LIMIT 50
-        """
-        result = db.execute(text(sql), {"point": point_wkt, "radius": radius_km * 1000, "user_id": user_id})
-        return result.mappings().all()
-    
-    except SQLAlchemyError as e:
-        log_error(logger, e, {"user_id": user_id, "lat": lat, "lng": lng, "radius_km": radius_km}, "get_nearby_vehicles_db_error")
+    # Validate coordinates
+    if not (-90 <= lat <= 90) or not (-180 <= lng <= 180):
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Database query failed"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid coordinates"
         )
-    
-    except Exception as e:
-        log_error(logger, e, {"user_id": user_id, "lat": lat, "lng": lng, "radius_km": radius_km}, "get_nearby_vehicles_error")
+
+    if radius_km <= 0 or radius_km > 100:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="An unexpected error occurred"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Radius must be between 0 and 100 km"
         )
 
+    user_id = current_user["user_id"]
+
+    # Coordinates rounded to ~100 m cells so nearby requests from the
+    # same area share an entry; user_id is part of the key because the
+    # query excludes the requester's own vehicles
+    cache_key = f"nb:{round(lat, 3)}:{round(lng, 3)}:{radius_km}:{limit}:{offset}:{user_id}"
+    cached = await redis_client.get(cache_key)
+    if cached:
+        return orjson.loads(cached)
+
+    point_wkt = f'SRID=4326;POINT({lng} {lat})'
+
+    # Only show vehicles with future availability slots
+    result = await db.execute(_NEARBY_SQL, {
+        "point": point_wkt,
+        "radius": radius_km * 1000,
+        "user_id": user_id,
+        "limit": limit,
+        "offset": offset
+    })
+    rows = [dict(row) for row in result.mappings().all()]
+
+    await redis_client.set(cache_key, orjson.dumps(rows, default=str), ex=_NEARBY_CACHE_TTL_SECONDS)
+
+    return rows
+
 @router.get("/{vehicle_id}", response_model=VehicleResponse)
-def get_vehicle_details(vehicle_id: str, db: Session = Depends(get_db)):
+async def get_vehicle_details(vehicle_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """Get full vehicle information by ID"""
-    try:
-        # Validate UUID format
-        try:
-            uuid_obj = UUID(vehicle_id)
-        except ValueError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid vehicle ID format"
-            )
-        
-        vehicle = db.query(VehicleModel).filter(
-            VehicleModel.id == uuid_obj,
-            VehicleModel.deleted_at.is_(None)
-        ).first()
-        
-        if not vehicle:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Vehicle not found"
-            )
-        
-        # Get coordinates from PostGIS geometry
-        lat = db.scalar(ST_Y(vehicle.location))
-        lng = db.scalar(ST_X(vehicle.location))
-        
-        # Get vehicle photos
-        photos = db.query(VehiclePhoto).filter(VehiclePhoto.vehicle_id == vehicle_id).all()
-        
-        return {
-            "id": vehicle.id,
-            "owner_id": vehicle.owner_id,
-            "brand": vehicle.brand,
-            "model": vehicle.model,
-            "latitude": lat,
-            "longitude": lng,
-            "available": vehicle.available,
-            "vehicle_type": vehicle.vehicle_type,
-            "color": vehicle.color,
-            "license_plate": vehicle.license_plate,
-            "year": vehicle.year,
-            "created_at": vehicle.created_at,
-            "photos": photos
-        }
-    
-    except SQLAlchemyError as e:
-        log_error(logger, e, {"vehicle_id": vehicle_id}, "get_vehicle_details_db_error")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Database error occurred"
-        )
-    
-    except Exception as e:
-        log_error(logger, e, {"vehicle_id": vehicle_id}, "get_vehicle_details_error")
+    vehicle = (await db.execute(_VEHICLE_DETAILS_SQL, {"vehicle_id": str(vehicle_id)})).first()
+
+    if not vehicle:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="An unexpected error occurred"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Vehicle not found"
         )
 
+    return {
+        "id": vehicle.id,
+        "owner_id": vehicle.owner_id,
+        "brand": vehicle.brand,
+        "model": vehicle.model,
+        "latitude": vehicle.latitude,
+        "longitude": vehicle.longitude,
+        "available": vehicle.available,
+        "vehicle_type": vehicle.vehicle_type,
+        "color": vehicle.color,
+        "license_plate": vehicle.license_plate,
+        "year": vehicle.year,
+        "created_at": vehicle.created_at,
+        "photos": vehicle.photos
+    }
+
+# Hard ceiling per photo; oversized requests are rejected before their
+# bytes are buffered in memory
+_MAX_PHOTO_BYTES = 10 * 1024 * 1024
+
+_ALLOWED_MIME = frozenset({"image/jpeg", "image/png", "image/jpg"})
+
+# Nearby results barely change second to second; a short TTL absorbs
+# bursts around hotspots while staying fresh enough for a moving map
+_NEARBY_CACHE_TTL_SECONDS = 15
+
+async def _read_photo_bounded(file: UploadFile) -> bytes:
+    """Read an upload in 1 MiB chunks, aborting once it exceeds the cap.
+
+    The declared file.size comes from client multipart headers and can be
+    absent or wrong; counting the bytes actually read is the enforcement.
+    """
+    buf = bytearray()
+    while chunk := await file.read(1 << 20):
+        buf.extend(chunk)
+        if len(buf) > _MAX_PHOTO_BYTES:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail="Photo exceeds the 10 MB size limit"
+            )
+    return bytes(buf)
+
+def _upload_photo_to_storage(vehicle_id: str, file_content: bytes, content_type: str, file_extension: str):
+    """Blur one photo and push both variants to Supabase Storage.
+
+    The supabase SDK is synchronous, so this runs in a worker thread and
+    returns the (blurred_url, original_url) pair for the DB row.
+    """
+    # Blur license plates before upload
+    from ..image_processing import plate_blurrer
+    blurred_content = plate_blurrer.blur_license_plate(file_content)
+
+    # Upload blurred version (public)
+    blurred_filename = f"vehicles/{vehicle_id}/blurred_{uuid.uuid4()}.{file_extension}"
+    supabase.storage.from_("vehicle-photos").upload(
+        blurred_filename,
+        blurred_content,
+        {"content-type": content_type}
+    )
+    blurred_url = supabase.storage.from_("vehicle-photos").get_public_url(blurred_filename)
+
+    # Upload original version (same bucket, different folder)
+    original_filename = f"vehicles/{vehicle_id}/original_{uuid.uuid4()}.{file_extension}"
+    supabase.storage.from_("vehicle-photos").upload(
+        original_filename,
+        file_content,
+        {"content-type": content_type}
+    )
+    original_url = supabase.storage.from_("vehicle-photos").get_public_url(original_filename)
+
+    return blurred_url, original_url
+
 @router.post("/{vehicle_id}/upload_photos")
-def upload_vehicle_photos(
-    vehicle_id: str,
+async def upload_vehicle_photos(
+    vehicle_id: UUID,
+    request: Request,
     files: List[UploadFile] = File(...),
     current_user_data: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Upload photos for a vehicle"""
-    try:
-        uuid_obj = UUID(vehicle_id)
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid vehicle ID format"
+    # Existence + ownership only need the id column, not a hydrated model
+    vehicle_exists = await db.scalar(
+        select(VehicleModel.id).where(
+            VehicleModel.id == vehicle_id,
+            VehicleModel.owner_id == current_user_data["user_id"]
         )
-    
-    vehicle = db.query(VehicleModel).filter(
-        VehicleModel.id == uuid_obj,
-        VehicleModel.owner_id == current_user_data["user_id"]
-    ).first()
-    
-    if not vehicle:
+    )
+
+    if not vehicle_exists:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Vehicle not found"
         )
-    
-    uploaded_photos = []
-    
-    for i, file in enumerate(files):
-        # Validate file type
-        if file.content_type not in ["image/jpeg", "image/png", "image/jpg"]:
+
+    # Cheapest check first: the declared request size bounds everything
+    # we could possibly buffer, so oversized requests die here unread
+    content_length = request.headers.get("content-length")
+    if content_length and int(content_length) > _MAX_PHOTO_BYTES * len(files):
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Upload too large"
+        )
+
+    # Validate every file before any byte leaves the server
+    for file in files:
+        if file.content_type not in _ALLOWED_MIME:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Only JPEG/PNG files allowed"
             )
-        
-        # Generate unique filename
-        file_extension = file.filename.split(".")[-1]
-        unique_filename = f"vehicles/{vehicle_id}/{uuid.uuid4()}.{file_extension}"
-        
-        # Upload to Supabase Storage
-        try:
-            file_content = file.file.read()
-            
-            # Blur license plates before upload
-            from ..image_processing import plate_blurrer
-            blurred_content = plate_blurrer.blur_license_plate(file_content)
-            
-            # Upload blurred version (public)
-            blurred_filename = f"vehicles/{vehicle_id}/blurred_{uuid.uuid4()}.{file_extension}"
-            supabase.storage.from_("vehicle-photos").upload(
-                blurred_filename, 
-                blurred_content,
-                {"content-type": file.content_type}
-            )
-            blurred_url = supabase.storage.from_("vehicle-photos").get_public_url(blurred_filename)
-            
-            # Upload original version (same bucket, different folder)
-            original_filename = f"vehicles/{vehicle_id}/original_{uuid.uuid4()}.{file_extension}"
-            supabase.storage.from_("vehicle-photos").upload(
-                original_filename,
-                file_content,
-                {"content-type": file.content_type}
-            )
-            original_url = supabase.storage.from_("vehicle-photos").get_public_url(original_filename)
-            
-            # Save to database
-            db_photo = VehiclePhoto(
-                vehicle_id=uuid_obj,
-                photo_url=blurred_url,
-                original_photo_url=original_url,
-                is_primary=(i == 0)
-            )
-            db.add(db_photo)
-            uploaded_photos.append({"url": blurred_url, "is_primary": (i == 0)})
-            
-        except Exception as e:
-            log_error(logger, e, {"vehicle_id": vehicle_id, "user_id": current_user_data["user_id"], "file_name": file.filename}, "photo_upload_error")
+        if file.size and file.size > _MAX_PHOTO_BYTES:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to upload photo: {str(e)}"
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail="Photo exceeds the 10 MB size limit"
             )
-    
-    db.commit()
+
+    contents = await asyncio.gather(*(_read_photo_bounded(file) for file in files))
+
+    # Upload all photos concurrently; each task handles its blur + two
+    # storage PUTs in a worker thread so wall time is the slowest file,
+    # not the sum of all of them
+    try:
+        urls = await asyncio.gather(*[
+            asyncio.to_thread(
+                _upload_photo_to_storage,
+                str(vehicle_id), content, file.content_type,
+                # splitext is safe on extension-less names, unlike split(".")[-1]
+                os.path.splitext(file.filename or "")[1].lstrip(".").lower() or "jpg"
+            )
+            for file, content in zip(files, contents)
+        ])
+    except Exception as e:
+        log_error(logger, e, {"vehicle_id": str(vehicle_id), "user_id": current_user_data["user_id"]}, "photo_upload_error")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to upload photo: {str(e)}"
+        )
+
+    # One multi-row INSERT for the whole batch instead of a statement per photo
+    photo_rows = [
+        {
+            "vehicle_id": vehicle_id,
+            "photo_url": blurred_url,
+            "original_photo_url": original_url,
+            "is_primary": (i == 0)
+        }
+        for i, (blurred_url, original_url) in enumerate(urls)
+    ]
+    await db.execute(insert(VehiclePhoto), photo_rows)
+    await db.commit()
+
+    uploaded_photos = [
+        {"url": row["photo_url"], "is_primary": row["is_primary"]}
+        for row in photo_rows
+    ]
     logger.info(f"Uploaded {len(files)} photos for vehicle", extra={
-        "vehicle_id": vehicle_id,
+        "vehicle_id": str(vehicle_id),
         "user_id": current_user_data["user_id"],
         "photo_count": len(files)
     })
     return {"message": f"Uploaded {len(files)} photos", "photos": uploaded_photos}
 
 @router.post("/{vehicle_id}/availability_slots")
-def set_vehicle_availability(
-    vehicle_id: str,
+async def set_vehicle_availability(
+    vehicle_id: UUID,
     availability_data: SetAvailabilityRequest,
     current_user_data: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Set vehicle availability slots"""
-    try:
-        uuid_obj = UUID(vehicle_id)
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid vehicle ID format"
+    vehicle = await db.scalar(
+        select(VehicleModel.id).where(
+            VehicleModel.id == vehicle_id,
+            VehicleModel.owner_id == current_user_data["user_id"]
         )
-    
-    vehicle = db.query(VehicleModel).filter(
-        VehicleModel.id == uuid_obj,
-        VehicleModel.owner_id == current_user_data["user_id"]
-    ).first()
-    
+    )
+
     if not vehicle:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -440,73 +471,70 @@ def set_vehicle_availability(
     #     ~VehicleAvailabilitySlot.id.in_(slots_with_bookings)
     # ).delete(synchronize_session=False)
     
-    # Create new slots
-    for slot in availability_data.slots:
-        db_slot = VehicleAvailabilitySlot(
-            vehicle_id=uuid_obj,
-            start_datetime=slot.start_datetime,
-            end_datetime=slot.end_datetime,
-            hourly_rate=slot.hourly_rate,
-            daily_rate=slot.daily_rate,
-            weekly_rate=slot.weekly_rate,
-            min_rental_hours=slot.min_rental_hours,
-            max_rental_hours=slot.max_rental_hours
-        )
-        db.add(db_slot)
-    
-    db.commit()
+    # Create new slots in one multi-row INSERT instead of a statement per slot
+    slot_rows = [
+        {
+            "vehicle_id": vehicle_id,
+            "start_datetime": slot.start_datetime,
+            "end_datetime": slot.end_datetime,
+            "hourly_rate": slot.hourly_rate,
+            "daily_rate": slot.daily_rate,
+            "weekly_rate": slot.weekly_rate,
+            "min_rental_hours": slot.min_rental_hours,
+            "max_rental_hours": slot.max_rental_hours
+        }
+        for slot in availability_data.slots
+    ]
+    if slot_rows:
+        await db.execute(insert(VehicleAvailabilitySlot), slot_rows)
+    await db.commit()
     return {"message": f"Set {len(availability_data.slots)} availability slots"}
 
 
 @router.get("/{vehicle_id}/availability_slots", response_model=List[AvailabilitySlotResponse])
-def get_vehicle_availability(vehicle_id: str, db: Session = Depends(get_db)):
+async def get_vehicle_availability(
+    vehicle_id: UUID,
+    limit: int = Query(200, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_db)
+):
     """Get vehicle availability slots"""
-    try:
-        uuid_obj = UUID(vehicle_id)
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid vehicle ID format"
-        )
-    
     current_time = datetime.now(timezone.utc)
-    
-    slots = db.query(VehicleAvailabilitySlot).filter(
-        VehicleAvailabilitySlot.vehicle_id == uuid_obj,
-        VehicleAvailabilitySlot.is_active == True,
-        VehicleAvailabilitySlot.end_datetime > current_time
-    ).order_by(VehicleAvailabilitySlot.start_datetime).all()
-    
+
+    # Server-side LIMIT bounds the rows materialized per request; an owner
+    # with a year of hourly slots pages through instead of getting them all
+    slots = (await db.scalars(
+        select(VehicleAvailabilitySlot).where(
+            VehicleAvailabilitySlot.vehicle_id == vehicle_id,
+            VehicleAvailabilitySlot.is_active == True,
+            VehicleAvailabilitySlot.end_datetime > current_time
+        ).order_by(VehicleAvailabilitySlot.start_datetime)
+        .limit(limit).offset(offset)
+    )).all()
+
     return slots
 
 @router.delete("/{vehicle_id}/availability_slots/{slot_id}")
-def delete_availability_slot(
-    vehicle_id: str,
-    slot_id: str,
+async def delete_availability_slot(
+    vehicle_id: UUID,
+    slot_id: UUID,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a vehicle availability slot"""
     user_id = current_user["user_id"]
     log_api_request(logger, "DELETE", f"/vehicles/{vehicle_id}/availability_slots/{slot_id}", user_id)
-    
-    try:
-        vehicle_uuid = UUID(vehicle_id)
-        slot_uuid = UUID(slot_id)
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid ID format"
-        )
-    
+
     try:
         # Get slot and verify ownership through vehicle
-        slot = db.query(VehicleAvailabilitySlot).join(VehicleModel).filter(
-            VehicleAvailabilitySlot.id == slot_uuid,
-            VehicleAvailabilitySlot.vehicle_id == vehicle_uuid,
-            VehicleModel.owner_id == current_user["user_id"]
-        ).first()
-        
+        slot = await db.scalar(
+            select(VehicleAvailabilitySlot).join(VehicleModel).where(
+                VehicleAvailabilitySlot.id == slot_id,
+                VehicleAvailabilitySlot.vehicle_id == vehicle_id,
+                VehicleModel.owner_id == current_user["user_id"]
+            )
+        )
+
         if not slot:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -514,11 +542,13 @@ def delete_availability_slot(
             )
         
         # Check for active bookings in this slot
-        active_bookings = db.query(Booking).filter(
-            Booking.availability_slot_id == slot_uuid,
-            Booking.status.in_(['confirmed', 'active'])
-        ).count()
-        
+        active_bookings = await db.scalar(
+            select(func.count()).select_from(Booking).where(
+                Booking.availability_slot_id == slot_id,
+                Booking.status.in_(['confirmed', 'active'])
+            )
+        )
+
         if active_bookings > 0:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
@@ -527,12 +557,12 @@ def delete_availability_slot(
         
         # Soft delete - set is_active to false
         slot.is_active = False
-        db.commit()
+        await db.commit()
         
-        log_database_operation(logger, "SOFT_DELETE", "vehicle_availability_slots", user_id, slot_id)
+        log_database_operation(logger, "SOFT_DELETE", "vehicle_availability_slots", user_id, str(slot_id))
         log_business_event(logger, "availability_slot_deleted", {
-            "slot_id": slot_id,
-            "vehicle_id": vehicle_id,
+            "slot_id": str(slot_id),
+            "vehicle_id": str(vehicle_id),
             "user_id": user_id
         })
         
@@ -544,104 +574,66 @@ def delete_availability_slot(
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
-        log_error(logger, e, {"vehicle_id": vehicle_id, "slot_id": slot_id, "user_id": user_id}, "delete_availability_slot")
+        await db.rollback()
+        log_error(logger, e, {"vehicle_id": str(vehicle_id), "slot_id": str(slot_id), "user_id": user_id}, "delete_availability_slot")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to delete availability slot"
         )
 
 @router.delete("/{vehicle_id}")
-def delete_vehicle(vehicle_id: str, current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
+async def delete_vehicle(vehicle_id: UUID, current_user: dict = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
     """Delete a vehicle (soft delete)"""
-    try:
-        uuid_obj = UUID(vehicle_id)
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid vehicle ID format"
-        )
-    
-    try:
-        # Verify vehicle ownership
-        vehicle = db.query(VehicleModel).filter(
-            VehicleModel.id == uuid_obj,
+    # Verify vehicle ownership
+    vehicle = await db.scalar(
+        select(VehicleModel).where(
+            VehicleModel.id == vehicle_id,
             VehicleModel.owner_id == current_user["user_id"],
             VehicleModel.deleted_at.is_(None)
-        ).first()
-        print("Vehicle found:", vehicle)
-        if not vehicle:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Vehicle not found or you don't have permission to delete it"
-            )
-        
-        # # Check for active bookings
-        # active_bookings = db.query(Booking).filter(
-        #     Booking.vehicle_id == uuid_obj,
-        #     Booking.status.in_(['confirmed', 'active']),
-        #     Booking.end_time > datetime.utcnow()
-        # ).count()
-        
-        # if active_bookings > 0:
-        #     raise HTTPException(
-        #         status_code=status.HTTP_409_CONFLICT,
-        #         detail="Cannot delete vehicle with active or upcoming bookings"
-        #     )
-        
-        # Soft delete - set deleted_at timestamp
-        vehicle.deleted_at = datetime.utcnow()
-        vehicle.available = False
-        
-        # Deactivate availability slots
-        db.query(VehicleAvailabilitySlot).filter(
-            VehicleAvailabilitySlot.vehicle_id == uuid_obj
-        ).update({"is_active": False})
-        
-        db.commit()
-        return {
-            "status": "success",
-            "message": "Vehicle deleted successfully",
-            "vehicle_id": str(vehicle_id)
-        }
-    
-    except IntegrityError as e:
-        db.rollback()
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Cannot delete vehicle due to data constraints"
         )
-    
-    except SQLAlchemyError as e:
-        print(e)
-        db.rollback()
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Database error occurred while deleting vehicle"
-        )
-    
-    except HTTPException:
-        raise
-    
-    except Exception as e:
-        print(e)
-        db.rollback()
+    )
+    if not vehicle:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="An unexpected error occurred"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Vehicle not found or you don't have permission to delete it"
         )
 
+    # # Check for active bookings
+    # active_bookings = db.query(Booking).filter(
+    #     Booking.vehicle_id == uuid_obj,
+    #     Booking.status.in_(['confirmed', 'active']),
+    #     Booking.end_time > datetime.utcnow()
+    # ).count()
+
+    # if active_bookings > 0:
+    #     raise HTTPException(
+    #         status_code=status.HTTP_409_CONFLICT,
+    #         detail="Cannot delete vehicle with active or upcoming bookings"
+    #     )
+
+    # Soft delete - set deleted_at timestamp
+    vehicle.deleted_at = datetime.utcnow()
+    vehicle.available = False
+
+    # Deactivate availability slots
+    await db.execute(
+        update(VehicleAvailabilitySlot)
+        .where(VehicleAvailabilitySlot.vehicle_id == vehicle_id)
+        .values(is_active=False)
+    )
+
+    await db.commit()
+    return {
+        "status": "success",
+        "message": "Vehicle deleted successfully",
+        "vehicle_id": str(vehicle_id)
+    }
+
 # get vehicle photos
 @router.get("/{vehicle_id}/photos")
-def get_vehicle_photos(vehicle_id: str, db: Session = Depends(get_db)):
+async def get_vehicle_photos(vehicle_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """Fetch vehicle photos"""
-    try:
-        uuid_obj = UUID(vehicle_id)
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid vehicle ID format"
-        )
-
-    photos = db.query(VehiclePhoto).filter(VehiclePhoto.vehicle_id == uuid_obj).all()
+    photos = (await db.scalars(
+        select(VehiclePhoto).where(VehiclePhoto.vehicle_id == vehicle_id)
+    )).all()
     return photos
\ No newline at end of file
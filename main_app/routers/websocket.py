@@ -1,8 +1,11 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query, HTTPException, status
-from typing import Dict, List
-import json
+from typing import Dict, Set
+from collections import defaultdict
+import orjson
 import asyncio
-from uuid import UUID
+import time
+from functools import lru_cache
+from uuid import UUID, uuid4
 from datetime import datetime, timezone
 import logging
 import jwt
@@ -10,25 +13,29 @@ from ..auth import SECRET_KEY, ALGORITHM
 
 router = APIRouter()
 
+# Fixed frames encoded once at import
+_PING_PAYLOAD = orjson.dumps({"type": "ping"})
+_PONG_PAYLOAD = orjson.dumps({"type": "pong"})
+
 class ConnectionManager:
     def __init__(self):
         self.active_connections: Dict[str, WebSocket] = {}
-        self.user_connections: Dict[str, List[str]] = {}
+        self.user_connections: Dict[str, Set[str]] = defaultdict(set)
         self.user_status: Dict[str, str] = {}
         self.typing_status: Dict[str, Dict[str, bool]] = {}
         self.connection_heartbeat: Dict[str, datetime] = {}
 
     async def connect(self, websocket: WebSocket, user_id: str):
         await websocket.accept()
-        connection_id = f"{user_id}_{datetime.now().timestamp()}"
+        # uuid4 keeps near-simultaneous connects on one user from colliding
+        # (a timestamp-based id could silently overwrite a live socket)
+        connection_id = f"{user_id}_{uuid4().hex}"
         
         self.active_connections[connection_id] = websocket
         self.connection_heartbeat[connection_id] = datetime.now(timezone.utc)
         
-        if user_id not in self.user_connections:
-            self.user_connections[user_id] = []
-        self.user_connections[user_id].append(connection_id)
-        
+        self.user_connections[user_id].add(connection_id)
+
         self.user_status[user_id] = "online"
         return connection_id
 
@@ -40,10 +47,7 @@ class ConnectionManager:
             del self.connection_heartbeat[connection_id]
         
         if user_id in self.user_connections:
-            self.user_connections[user_id] = [
-                conn for conn in self.user_connections[user_id] 
-                if conn != connection_id
-            ]
+            self.user_connections[user_id].discard(connection_id)
             if not self.user_connections[user_id]:
                 del self.user_connections[user_id]
                 self.user_status[user_id] = "offline"
@@ -72,28 +76,48 @@ class ConnectionManager:
     async def send_to_user(self, user_id: str, message: dict):
         """Send message to all connections of a user"""
         if user_id in self.user_connections:
-            disconnected = []
-            for connection_id in self.user_connections[user_id]:
-                if connection_id in self.active_connections:
-                    try:
-                        await self.active_connections[connection_id].send_text(
-                            json.dumps(message, default=str)
-                        )
-                    except:
-                        disconnected.append(connection_id)
-            
-            for conn_id in disconnected:
-                self.disconnect(conn_id, user_id)
+            # Serialize once; every tab of the user gets the same bytes
+            payload = orjson.dumps(message, default=str)
+
+            live_pairs = [
+                (connection_id, self.active_connections[connection_id])
+                for connection_id in self.user_connections[user_id]
+                if connection_id in self.active_connections
+            ]
+
+            # Overlap the writes across connections; failures come back as
+            # exception results instead of aborting the whole fan-out
+            results = await asyncio.gather(
+                *(websocket.send_bytes(payload) for _, websocket in live_pairs),
+                return_exceptions=True
+            )
+
+            for (connection_id, _), result in zip(live_pairs, results):
+                if isinstance(result, Exception):
+                    self.disconnect(connection_id, user_id)
 
 manager = ConnectionManager()
 
+@lru_cache(maxsize=4096)
+def _decode_token(token: str) -> dict:
+    """Decode and verify the JWT signature, cached per token.
+
+    Mobile clients reconnect with the same token, so repeat handshakes
+    skip the HMAC. Expiry is re-checked by the caller on every handshake
+    because a cached payload may have expired since it was decoded.
+    """
+    return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
 def verify_websocket_token(token: str) -> dict:
     """Verify JWT token for WebSocket connection"""
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = _decode_token(token)
         user_id = payload.get("sub")
         if user_id is None:
             raise Exception("Invalid token payload")
+        exp = payload.get("exp")
+        if exp is not None and exp <= time.time():
+            raise Exception("Token expired")
         return payload
     except jwt.ExpiredSignatureError:
         raise Exception("Token expired")
@@ -120,25 +144,22 @@ async def websocket_endpoint(
         
         connection_id = await manager.connect(websocket, user_id)
         
-        await websocket.send_text(json.dumps({
+        await websocket.send_bytes(orjson.dumps({
             "type": "connected",
             "user_id": user_id,
             "status": "online",
             "connection_id": connection_id
         }))
         
-        # Start heartbeat
-        asyncio.create_task(heartbeat_task(websocket, connection_id, user_id))
-        
         while True:
             data = await websocket.receive_text()
-            message_data = json.loads(data)
+            message_data = orjson.loads(data)
             
             message_type = message_data.get("type")
             
             if message_type == "ping":
                 manager.update_heartbeat(connection_id)
-                await websocket.send_text(json.dumps({"type": "pong"}))
+                await websocket.send_bytes(_PONG_PAYLOAD)
             
             elif message_type == "typing":
                 booking_id = message_data.get("booking_id")
@@ -152,7 +173,7 @@ async def websocket_endpoint(
                 target_user_id = message_data.get("target_user_id")
                 if target_user_id:
                     status = manager.get_user_status(target_user_id)
-                    await websocket.send_text(json.dumps({
+                    await websocket.send_bytes(orjson.dumps({
                         "type": "user_status",
                         "user_id": target_user_id,
                         "status": status
@@ -165,15 +186,29 @@ async def websocket_endpoint(
         if connection_id:
             manager.disconnect(connection_id, user_id)
 
-async def heartbeat_task(websocket: WebSocket, connection_id: str, user_id: str):
-    """Send periodic heartbeat to maintain connection"""
-    try:
-        while connection_id in manager.active_connections:
-            await asyncio.sleep(30)  # Send ping every 30 seconds
-            if connection_id in manager.active_connections:
-                await websocket.send_text(json.dumps({"type": "ping"}))
-    except:
-        manager.disconnect(connection_id, user_id)
+async def _global_heartbeat():
+    """Ping every active connection on one shared 30s timer.
+
+    One sweeper task replaces the per-connection heartbeat coroutines, so
+    the scheduler wakes once per interval regardless of connection count.
+    Failed pings are ignored here; the endpoint's receive loop observes
+    the dead socket and cleans up.
+    """
+    while True:
+        await asyncio.sleep(30)  # Send ping every 30 seconds
+        await asyncio.gather(
+            *(websocket.send_bytes(_PING_PAYLOAD) for websocket in list(manager.active_connections.values())),
+            return_exceptions=True
+        )
+
+# Module-level reference keeps the sweeper alive; the event loop only
+# holds tasks weakly, so an unreferenced task can be garbage-collected
+_heartbeat_task = None
+
+@router.on_event("startup")
+async def _start_heartbeat():
+    global _heartbeat_task
+    _heartbeat_task = asyncio.create_task(_global_heartbeat())
 
 # Global functions for real-time notifications
 async def notify_new_message(recipient_user_id: str, sender_name: str, message_data: dict):
@@ -1,26 +1,86 @@
-from pydantic import BaseModel, Field, validator
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, ConfigDict, Field, validator
+from typing import Annotated, Optional, List, Dict, Any, Literal
 from uuid import UUID
 from datetime import datetime, time, date
 from decimal import Decimal
 import re
 
+# Compiled once at import so the validator skips the re-module cache probe
+# on every registration
+_EMAIL_RE = re.compile(r'^[\w\.-]+@[\w\.-]+\.\w+$')
+
+# One constrained-string alias shared by every model that takes a phone
+# number, so pydantic-core builds the validator schema once instead of
+# per use-site. The pattern constraint runs natively in pydantic-core,
+# with no Python callback per field.
+PhoneNumber = Annotated[str, Field(min_length=10, max_length=15, pattern=r'^\+?[0-9]{10,15}$')]
+
+def _is_valid_phone(number: str) -> bool:
+    """Check the phone format without invoking the regex engine.
+
+    str.isascii/str.isdigit run as C byte loops, so on 10-15 character
+    strings the whole check is a couple of memory scans rather than a
+    regex-machinery call. isascii guards isdigit from accepting
+    non-ASCII unicode digits.
+    """
+    rest = number.removeprefix('+')
+    return 10 <= len(rest) <= 15 and rest.isascii() and rest.isdigit()
+
+# Optional Hyperscan path for bulk validation (contact imports, CSV
+# ingestion): the anchored single pattern compiles to a tiny DFA that
+# beats backtracking re on large batches. Falls back to the compiled
+# pattern when hyperscan isn't installed.
+try:
+    import hyperscan
+    _PHONE_DB = hyperscan.Database()
+    _PHONE_DB.compile(
+        expressions=[rb'^\+?[0-9]{10,15}$'],
+        ids=[0],
+        flags=[hyperscan.HS_FLAG_SINGLEMATCH]
+    )
+except ImportError:
+    _PHONE_DB = None
+
+def bulk_validate_phones(numbers: List[str]) -> List[bool]:
+    """Validate a batch of phone numbers against the registration format."""
+    if _PHONE_DB is None:
+        return [_is_valid_phone(number) for number in numbers]
+
+    results = []
+    for number in numbers:
+        matched = False
+
+        def _on_match(pattern_id, start, end, flags, context):
+            nonlocal matched
+            matched = True
+
+        _PHONE_DB.scan(number.encode(), match_event_handler=_on_match)
+        results.append(matched)
+    return results
+
+# Closed value sets: pydantic-core dispatches Literal[str, ...] through an
+# interned-string lookup instead of generic str validation, and instances
+# share the interned values
+BookingStatus = Literal["pending", "confirmed", "active", "completed", "cancelled"]
+PaymentStatus = Literal["pending", "paid", "completed", "failed", "refunded"]
+MessageType = Literal["text", "image", "location", "system"]
+
 class UserRegister(BaseModel):
-    phone_number: str = Field(..., min_length=10, max_length=15)
+    phone_number: PhoneNumber
     full_name: str = Field(..., min_length=2, max_length=100)
-    email: Optional[str] = Field(None, pattern=r'^[\w\.-]+@[\w\.-]+\.\w+$')
-    
-    @validator('phone_number')
-    def validate_phone(cls, v):
-        if not re.match(r'^[+]?[0-9]{10,15}$', v):
-            raise ValueError('Invalid phone number format')
+    email: Optional[str] = None
+
+    @validator('email')
+    def validate_email(cls, v):
+        if v is not None and not _EMAIL_RE.match(v):
+            raise ValueError('Invalid email format')
         return v
 
 class SendOTP(BaseModel):
-    phone_number: str = Field(..., min_length=10, max_length=15)
+    phone_number: PhoneNumber
 
 class VerifyOTP(BaseModel):
-    phone_number: str = Field(..., min_length=10, max_length=15)
+    phone_number: PhoneNumber
     otp_code: str = Field(..., min_length=4, max_length=6)
 
 class OTPResponse(BaseModel):
@@ -41,8 +101,7 @@ class UserResponse(BaseModel):
     is_verified: bool
     is_active: bool
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class Vehicle(BaseModel):
     brand: str
@@ -60,8 +119,7 @@ class VehiclePhoto(BaseModel):
     photo_url: str
     is_primary: bool
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class SimpleVehicleResponse(BaseModel):
     id: UUID
@@ -94,8 +152,7 @@ class AvailabilitySlotResponse(BaseModel):
     max_rental_hours: Optional[int]
     is_active: bool
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class SetAvailabilityRequest(BaseModel):
     slots: List[AvailabilitySlot]
@@ -105,10 +162,10 @@ class BookingRequest(BaseModel):
     availability_slot_id: Optional[str] = None
     start_time: datetime
     end_time: datetime
-    base_amount: float
-    security_deposit: float = 0
-    platform_fee: float = 0
-    total_amount: float
+    base_amount: float = Field(..., ge=0)
+    security_deposit: float = Field(0, ge=0)
+    platform_fee: float = Field(0, ge=0)
+    total_amount: float = Field(..., ge=0)
     pickup_address: Optional[str] = None
     dropoff_address: Optional[str] = None
     special_instructions: Optional[str] = None
@@ -120,19 +177,18 @@ class BookingResponse(BaseModel):
     availability_slot_id: Optional[UUID]
     start_time: datetime
     end_time: datetime
-    status: str
+    status: BookingStatus
     base_amount: float
     security_deposit: float
     platform_fee: float
     total_amount: float
-    payment_status: str
+    payment_status: PaymentStatus
     pickup_address: Optional[str]
     dropoff_address: Optional[str]
     special_instructions: Optional[str]
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class OwnerDashboardStats(BaseModel):
     total_vehicles: int
@@ -151,7 +207,7 @@ class OwnerBookingResponse(BaseModel):
     renter_phone: str
     start_time: datetime
     end_time: datetime
-    status: str
+    status: BookingStatus
     amount: float
     pickup_address: Optional[str]
     special_instructions: Optional[str]
@@ -160,6 +216,16 @@ class OwnerBookingResponse(BaseModel):
 class BookingActionRequest(BaseModel):
     reason: Optional[str] = None
 
+class BookingStatusUpdate(BaseModel):
+    status: Literal["CONFIRMED", "REJECTED"]
+
+class VehicleAvailabilityUpdate(BaseModel):
+    is_available: bool
+
+class VehicleRatesUpdate(BaseModel):
+    hourly_rate: Optional[float] = Field(None, gt=0)
+    daily_rate: Optional[float] = Field(None, gt=0)
+
 class VehicleResponse(BaseModel):
     id: UUID
     owner_id: UUID
@@ -175,14 +241,15 @@ class VehicleResponse(BaseModel):
     created_at: datetime
     photos: List[VehiclePhoto] = []
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Messaging Schemas
 class SendMessageRequest(BaseModel):
     booking_id: UUID
     message_text: str = Field(..., min_length=1, max_length=1000)
-    message_type: str = Field("text", pattern="^(text|image|location)$")
+    # Clients may not send 'system' messages, so this is narrower than the
+    # MessageType alias used for responses
+    message_type: Literal["text", "image", "location"] = "text"
     attachment_url: Optional[str] = None
 
 class MessageResponse(BaseModel):
@@ -190,7 +257,7 @@ class MessageResponse(BaseModel):
     sender_id: UUID
     sender_name: str
     message_text: str
-    message_type: str
+    message_type: MessageType
     attachment_url: Optional[str]
     is_read: bool
     created_at: datetime
@@ -241,8 +308,7 @@ class ErrorAuditResponse(BaseModel):
     resolved: bool
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class ErrorAuditCreate(BaseModel):
     error_type: str
@@ -1,24 +1,33 @@
+import asyncio
+import logging
 import os
-from twilio.rest import Client
+from functools import lru_cache
 from .logging_config import get_logger, log_error
 
 logger = get_logger(__name__)
 
+# Template halves built once; the send path only pays for one concatenation
+_OTP_PREFIX = "Your RediRental verification code is: "
+_OTP_SUFFIX = ". Valid for 5 minutes."
+
 class SMSService:
     def __init__(self):
         self.account_sid = os.getenv("TWILIO_ACCOUNT_SID")
         self.auth_token = os.getenv("TWILIO_AUTH_TOKEN")
         self.from_number = os.getenv("TWILIO_PHONE_NUMBER")
-        
+
         if not all([self.account_sid, self.auth_token, self.from_number]):
             logger.warning("Twilio credentials not configured, SMS will be printed to console")
             self.client = None
         else:
+            # Imported here so workers that never send an SMS don't pay for
+            # Twilio's REST resource tree at module import
+            from twilio.rest import Client
             self.client = Client(self.account_sid, self.auth_token)
     
     def send_otp(self, phone_number: str, otp_code: str) -> bool:
         """Send OTP via SMS"""
-        message = f"Your RediRental verification code is: {otp_code}. Valid for 5 minutes."
+        message = _OTP_PREFIX + otp_code + _OTP_SUFFIX
         
         try:
             if self.client:
@@ -28,20 +37,35 @@ class SMSService:
                     from_=self.from_number,
                     to=phone_number
                 )
-                logger.info(f"SMS sent successfully", extra={
-                    "phone_number": phone_number,
-                    "message_sid": message_obj.sid
-                })
+                # isEnabledFor gate skips the extra-dict allocation when
+                # INFO logging is off
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("SMS sent successfully", extra={
+                        "phone_number": phone_number,
+                        "message_sid": message_obj.sid
+                    })
                 return True
             else:
                 # Development mode - print to console
                 print(f"SMS to {phone_number}: {message}")
-                logger.info(f"SMS printed to console (dev mode)", extra={"phone_number": phone_number})
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("SMS printed to console (dev mode)", extra={"phone_number": phone_number})
                 return True
                 
         except Exception as e:
             log_error(logger, e, {"phone_number": phone_number}, "sms_send_error")
             return False
 
-# Global SMS service instance
-sms_service = SMSService()
\ No newline at end of file
+    async def send_otp_async(self, phone_number: str, otp_code: str) -> bool:
+        """Send OTP without blocking the event loop.
+
+        The Twilio SDK is synchronous, so the full round-trip runs in a
+        worker thread — same pattern as the Supabase storage uploads.
+        """
+        return await asyncio.to_thread(self.send_otp, phone_number, otp_code)
+
+# Shared SMS service instance, built lazily on first use so importing this
+# module stays free of Twilio initialization
+@lru_cache(maxsize=1)
+def get_sms_service() -> SMSService:
+    return SMSService()
\ No newline at end of file